@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for the pose WebSocket server
+Starts pose_websocket_server.py against a synthetic or replayed source,
+connects N simulated clients and records throughput, capture-to-receive
+latency, server CPU and dropped frames for each client count
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+
+import numpy as np
+import websockets
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(REPO_ROOT, 'src', 'backend')
+
+sys.path.insert(0, BACKEND_DIR)
+from utils import SUBPROTOCOL_BINARY, decode_hand_positions  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cpu_seconds(pid):
+    """User + system CPU time of a process, or None where /proc is unavailable"""
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def fetch_metrics(port):
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics', timeout=5) as response:
+        return json.loads(response.read())
+
+
+async def run_client(url, binary, warmup, duration):
+    """One simulated client: counts messages and capture-to-receive latency"""
+    subprotocols = [SUBPROTOCOL_BINARY] if binary else None
+    latencies = []
+    messages = 0
+    missed = 0
+    last_seq = None
+
+    async with websockets.connect(url, subprotocols=subprotocols, max_queue=None) as ws:
+        loop = asyncio.get_running_loop()
+        start = loop.time() + warmup
+        end = start + duration
+
+        while True:
+            remaining = end - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                message = await asyncio.wait_for(ws.recv(), remaining)
+            except asyncio.TimeoutError:
+                break
+            received_at = time.monotonic()
+            wall_received_at = time.time()
+            if loop.time() < start:
+                continue
+
+            if isinstance(message, bytes):
+                seq, timestamp, _, _, captured_at = decode_hand_positions(message)
+                if captured_at is not None:
+                    latency = (received_at - captured_at) * 1000.0
+                else:
+                    latency = (wall_received_at - timestamp) * 1000.0
+            else:
+                data = json.loads(message)
+                if data.get('type') != 'handPositions':
+                    continue
+                seq = data['seq']
+                if 'capturedAt' in data:
+                    latency = (received_at - data['capturedAt']) * 1000.0
+                else:
+                    latency = (wall_received_at - data['timestamp']) * 1000.0
+
+            messages += 1
+            latencies.append(latency)
+            if last_seq is not None and seq > last_seq + 1:
+                missed += seq - last_seq - 1
+            last_seq = seq
+
+    return {'messages': messages, 'missed_seq': missed, 'latencies': latencies}
+
+
+def run_client_group(args):
+    """Run a share of the simulated clients in this worker process"""
+    url, count, binary, warmup, duration = args
+
+    async def group():
+        tasks = [run_client(url, binary, warmup, duration) for _ in range(count)]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(group())
+    return [r if isinstance(r, dict) else {'error': repr(r)} for r in results]
+
+
+def wait_for_port(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 3) if len(values) else None
+
+
+def bench(args, clients):
+    """Benchmark one client count against a fresh server process"""
+    port = free_port()
+    metrics_port = free_port()
+    command = [sys.executable, 'pose_websocket_server.py',
+               '--port', str(port), '--metrics_port', str(metrics_port),
+               '--source', args.source, '--fps', str(args.fps)]
+    command += args.server_args
+
+    server = subprocess.Popen(command, cwd=BACKEND_DIR,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_for_port(port):
+            raise RuntimeError('Server did not start listening')
+
+        workers = max(1, min(args.workers, clients))
+        shares = [clients // workers + (i < clients % workers) for i in range(workers)]
+        url = f'ws://127.0.0.1:{port}'
+        jobs = [(url, share, args.binary, args.warmup, args.duration) for share in shares]
+
+        with mp.Pool(workers) as pool:
+            pending = pool.map_async(run_client_group, jobs)
+
+            # Sample server CPU over the measurement window only
+            time.sleep(args.warmup)
+            cpu_start = cpu_seconds(server.pid)
+            metrics_start = fetch_metrics(metrics_port)
+            wall_start = time.monotonic()
+            time.sleep(args.duration)
+            cpu_end = cpu_seconds(server.pid)
+            metrics_end = fetch_metrics(metrics_port)
+            wall = time.monotonic() - wall_start
+
+            per_client = [r for group in pending.get() for r in group]
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    ok = [r for r in per_client if 'error' not in r]
+    all_latencies = np.concatenate([r['latencies'] for r in ok if r['latencies']] or [[]])
+    cpu_percent = None
+    if cpu_start is not None and cpu_end is not None:
+        cpu_percent = round(100.0 * (cpu_end - cpu_start) / wall, 1)
+
+    return {
+        'clients': clients,
+        'connected': len(ok),
+        'errors': [r['error'] for r in per_client if 'error' in r],
+        'messages_per_sec': round(sum(r['messages'] for r in ok) / args.duration, 1),
+        'messages_per_sec_per_client': round(
+            float(np.mean([r['messages'] for r in ok])) / args.duration, 1) if ok else None,
+        'latency_ms': {
+            'p50': percentile(all_latencies, 50),
+            'p99': percentile(all_latencies, 99),
+            'client_p50_median': percentile([percentile(r['latencies'], 50) for r in ok if r['latencies']], 50),
+            'client_p99_max': max((percentile(r['latencies'], 99) for r in ok if r['latencies']), default=None),
+        },
+        'server_cpu_percent': cpu_percent,
+        'results_per_sec': round((metrics_end['results'] - metrics_start['results']) / wall, 1),
+        'dropped_frames': metrics_end['dropped_frames'] - metrics_start['dropped_frames'],
+        'client_missed_seq': sum(r['missed_seq'] for r in ok),
+        'server_stages_ms': metrics_end['stages_ms'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark for the pose WebSocket server")
+    parser.add_argument("--clients", type=int, nargs='+', default=[1, 10, 50, 200],
+                        help="Client counts to benchmark, one server run each")
+    parser.add_argument("--source", default='synthetic:circles',
+                        help="Server input source, e.g. synthetic:swipe or video:session.mp4")
+    parser.add_argument("--fps", type=float, default=60.0, help="Source frame rate")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds ignored after connecting")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes that share the simulated clients")
+    parser.add_argument("--binary", action='store_true',
+                        help="Use the binary subprotocol")
+    parser.add_argument("--out", default="bench_results.json", help="Output JSON filename")
+    parser.add_argument("server_args", nargs=argparse.REMAINDER,
+                        help="Extra pose_websocket_server.py arguments after --")
+    args = parser.parse_args()
+    if args.server_args and args.server_args[0] == '--':
+        args.server_args = args.server_args[1:]
+
+    report = {
+        'commit': git_commit(),
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'source': args.source,
+        'fps': args.fps,
+        'format': 'binary' if args.binary else 'json',
+        'duration_s': args.duration,
+        'server_args': args.server_args,
+        'runs': []
+    }
+
+    for clients in args.clients:
+        print(f"Benchmarking {clients} client(s)...")
+        run = bench(args, clients)
+        report['runs'].append(run)
+        print(f"  {run['messages_per_sec']} msg/s, latency p50 {run['latency_ms']['p50']} ms "
+              f"p99 {run['latency_ms']['p99']} ms, server CPU {run['server_cpu_percent']}%, "
+              f"dropped frames {run['dropped_frames']}")
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,17 @@ Start the complete bubble game system
 Including WebSocket server and HTTP server
 """
 
+import asyncio
+import json
 import subprocess
 import sys
-import time
 import threading
 import os
 
+import websockets
+
+POSE_SERVER_URL = 'ws://localhost:8765'
+
 def start_websocket_server():
     """Start WebSocket server"""
     try:
@@ -19,11 +24,31 @@ def start_websocket_server():
     except Exception as e:
         print(f"WebSocket server failed to start: {e}")
 
+async def wait_for_pose_server(url, timeout=30.0):
+    """Wait until the pose server reports it is ready, or the timeout passes"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        try:
+            async with websockets.connect(url, open_timeout=1) as ws:
+                while True:
+                    message = json.loads(await asyncio.wait_for(
+                        ws.recv(), deadline - loop.time()))
+                    if message.get('type') == 'status' and message['state'] != 'starting':
+                        return message['state'] == 'ready'
+        except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException):
+            await asyncio.sleep(0.1)
+    return False
+
 def start_http_server():
     """Start HTTP server"""
     try:
+        # The WebSocket port is bound before the camera and model load
+        if asyncio.run(wait_for_pose_server(POSE_SERVER_URL)):
+            print("Pose server ready")
+        else:
+            print("Pose server not ready yet, starting HTTP server anyway")
         print("Starting HTTP server...")
-        time.sleep(2)  # Wait for WebSocket server to start
         os.chdir('../..')
         subprocess.run([sys.executable, 'scripts/start_https_server.py'], check=True)
     except Exception as e:
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Capture daemon that shares one camera with several local processes
+Decodes each frame once into a shared-memory ring; pose_websocket_server.py
+(--source shm) and main.py (--input shm:<name>) read from it instead of
+opening the camera themselves
+"""
+import argparse
+import signal
+import time
+from multiprocessing import shared_memory
+
+import cv2 as cv
+from utils import FrameRing, SyntheticCamera, VideoFileSource
+
+
+def open_capture(source, device, width, height, fps):
+    """Open the camera, or a synthetic/video stand-in paced in real time"""
+    kind, _, target = source.partition(':')
+    if kind == 'camera':
+        cap = cv.VideoCapture(device)
+        cap.set(cv.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+        cap.set(cv.CAP_PROP_BUFFERSIZE, 1)
+    elif kind == 'video':
+        cap = VideoFileSource(target)
+    elif kind == 'synthetic':
+        cap = SyntheticCamera(width, height, fps)
+    else:
+        raise ValueError(f"Unknown source: {source}")
+    return cap
+
+def create_ring(name, width, height, slots):
+    """Create the ring, replacing one a crashed daemon left behind; None if
+    another daemon is still publishing under that name"""
+    try:
+        return FrameRing(name, width, height, slots, create=True)
+    except FileExistsError:
+        pass
+    
+    # A running daemon keeps publishing, a leftover block stands still
+    existing = FrameRing(name)
+    seq = existing.seq
+    time.sleep(1.0)
+    alive = not existing.closed and existing.seq != seq
+    existing.close()
+    if alive:
+        print(f"Shared memory '{name}' is in use by another daemon; choose another --name")
+        return None
+    
+    print(f"Replacing shared memory '{name}' left behind by an earlier daemon")
+    stale = shared_memory.SharedMemory(name=name)
+    stale.close()
+    stale.unlink()
+    return FrameRing(name, width, height, slots, create=True)
+
+def get_args():
+    parser = argparse.ArgumentParser(description='Shared-memory camera daemon for Bubble Game')
+    parser.add_argument("--device", type=int, default=0, help="Camera device number")
+    parser.add_argument("--source", type=str, default='camera',
+                        help="camera, video:<path> or synthetic")
+    parser.add_argument("--width", type=int, default=640, help="Camera width")
+    parser.add_argument("--height", type=int, default=480, help="Camera height")
+    parser.add_argument("--fps", type=float, default=30.0,
+                        help="Frame rate of the synthetic source")
+    parser.add_argument("--name", type=str, default=None,
+                        help="Shared memory name (default: camera<device>)")
+    parser.add_argument("--slots", type=int, default=4,
+                        help="Frames kept in the ring; readers must finish a zero-copy frame within slots - 1 frames")
+    return parser.parse_args()
+
+def main():
+    args = get_args()
+    name = args.name or f'camera{args.device}'
+    
+    cap = open_capture(args.source, args.device, args.width, args.height, args.fps)
+    if not cap.isOpened():
+        print(f"Could not open source: {args.source}")
+        return
+    
+    # The ring is sized from the first frame, whatever the camera settled on
+    ret, frame = cap.read()
+    if not ret:
+        print("Could not read from the camera")
+        cap.release()
+        return
+    height, width = frame.shape[:2]
+    ring = create_ring(name, width, height, args.slots)
+    if ring is None:
+        cap.release()
+        return
+    ring.set_fps(cap.get(cv.CAP_PROP_FPS) or args.fps)
+    
+    running = True
+    def stop(signum, frame):
+        nonlocal running
+        running = False
+    signal.signal(signal.SIGTERM, stop)
+    
+    print(f"Publishing {width}x{height} frames to shared memory '{name}'")
+    print(f"Read them with --source shm:{name} or --input shm:{name}")
+    try:
+        while running:
+            if not ring.publish(cap):
+                print("Camera read failed")
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Readers see the closed flag and stop waiting for frames
+        ring.mark_closed()
+        cap.release()
+        ring.close()
+        ring.unlink()
+        print(f"Shared memory '{name}' released")
+
+if __name__ == '__main__':
+    main()
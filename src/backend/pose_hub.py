@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Multi-camera hub for the bubble game
+Runs one pose pipeline per camera in its own worker process and serves
+every station from a single WebSocket port, routing clients by path
+(ws://host:port/camera/<n>, where / is camera 0)
+"""
+import asyncio
+import websockets
+import multiprocessing as mp
+import argparse
+import threading
+from pose_websocket_server import PoseWebSocketServer
+from utils import (HandPositionSlot, SUBPROTOCOL_BINARY, SUBPROTOCOL_BINARY_V1,
+                   SUBPROTOCOL_JSON)
+
+class CameraWorker(PoseWebSocketServer):
+    """Pose pipeline that publishes into shared memory instead of WebSockets"""
+    
+    def __init__(self, slot, notify, demand):
+        super().__init__()
+        self.slot = slot
+        self.notify = notify
+        # The hub knows the clients and sets or clears this shared event
+        self.demand = demand
+    
+    def publish_hand_positions(self):
+        self.slot.write(self.hand_positions, self.landmarks, self.captured_at)
+        self.notify.set()
+    
+    def set_presence(self, present):
+        # The hub's channel reports presence changes to the console and clients
+        self.present = present
+
+def run_camera_worker(slot_name, notify, demand, stop, device, width, height, config):
+    """Entry point of a camera worker process"""
+    slot = HandPositionSlot(slot_name)
+    worker = CameraWorker(slot, notify, demand)
+    worker.config.update(config)
+    
+    try:
+        if not worker.init_camera_and_pose(device, width, height):
+            return
+        
+        # The hub asks us to stop through a shared event
+        worker.running = True
+        def wait_for_stop():
+            stop.wait()
+            worker.running = False
+        threading.Thread(target=wait_for_stop, daemon=True).start()
+        
+        worker.pose_detection_loop()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.cleanup()
+        slot.close()
+
+class PoseHub:
+    def __init__(self, host='localhost', port=8765, devices=(0,),
+                 width=640, height=480, config=None):
+        self.host = host
+        self.port = port
+        self.devices = list(devices)
+        self.width = width
+        self.height = height
+        
+        # Workers need spawn: forking a process that already runs threads is unsafe
+        self.ctx = mp.get_context('spawn')
+        
+        # One broadcaster per camera; they never open a camera themselves.
+        # Their demand event is shared with the worker, which idles without it
+        self.channels = []
+        for _ in self.devices:
+            channel = PoseWebSocketServer(host, port)
+            channel.config.update(config or {})
+            channel.demand = self.ctx.Event()
+            self.channels.append(channel)
+        
+        self.stop_event = self.ctx.Event()
+        self.slots = []
+        self.notifiers = []
+        self.workers = []
+        
+        self.running = False
+    
+    def start_workers(self):
+        """Spawn one pose pipeline process per camera"""
+        for device, channel in zip(self.devices, self.channels):
+            slot = HandPositionSlot(create=True)
+            notify = self.ctx.Event()
+            worker = self.ctx.Process(
+                target=run_camera_worker,
+                args=(slot.name, notify, channel.demand, self.stop_event, device,
+                      self.width, self.height, channel.config),
+                daemon=True
+            )
+            worker.start()
+            self.slots.append(slot)
+            self.notifiers.append(notify)
+            self.workers.append(worker)
+            print(f"Camera worker started (device: {device}, pid: {worker.pid})")
+    
+    def relay_camera(self, index):
+        """Forward new results of one worker to its channel (runs in a thread)"""
+        channel = self.channels[index]
+        slot = self.slots[index]
+        notify = self.notifiers[index]
+        last_seq = 0
+        
+        while self.running:
+            if not notify.wait(0.5):
+                continue
+            notify.clear()
+            
+            seq, positions, landmarks, captured_at = slot.read()
+            if positions is None or seq == last_seq:
+                continue
+            last_seq = seq
+            # Paused clients still follow presence, like on a single server
+            channel.set_presence(landmarks is not None)
+            # Results of the worker's idle grace period would be stale on resume
+            if not channel.demand.is_set():
+                continue
+            channel.hand_positions = positions
+            channel.landmarks = landmarks
+            # Worker and hub share the host's monotonic clock
+            channel.captured_at = captured_at
+            channel.publish_hand_positions()
+    
+    def route(self, path):
+        """Map a request path to a camera index, or None if there is no such camera"""
+        parts = path.split('?')[0].strip('/').split('/')
+        if parts == ['']:
+            return 0
+        if len(parts) == 2 and parts[0] == 'camera' and parts[1].isdigit():
+            index = int(parts[1])
+            if index < len(self.channels):
+                return index
+        return None
+    
+    async def register_client(self, websocket, path):
+        """Hand a new client to the channel of the camera it asked for"""
+        index = self.route(path)
+        if index is None:
+            print(f"Rejecting client {websocket.remote_address}: unknown path {path}")
+            await websocket.close(code=1008, reason='Unknown camera')
+            return
+        await self.channels[index].register_client(websocket, path)
+    
+    async def start_server(self):
+        """Start the workers and the shared WebSocket server"""
+        print(f"Starting pose hub with {len(self.devices)} camera(s) on {self.host}:{self.port}")
+        
+        self.running = True
+        self.start_workers()
+        for index, channel in enumerate(self.channels):
+            channel.start_broadcasting()
+            relay = threading.Thread(target=self.relay_camera, args=(index,))
+            relay.daemon = True
+            relay.start()
+        
+        server = await websockets.serve(
+            self.register_client, self.host, self.port,
+            subprotocols=[SUBPROTOCOL_BINARY, SUBPROTOCOL_BINARY_V1, SUBPROTOCOL_JSON]
+        )
+        
+        for index in range(len(self.channels)):
+            print(f"Camera {index}: ws://{self.host}:{self.port}/camera/{index}")
+        
+        await server.wait_closed()
+    
+    def cleanup(self):
+        """Stop the workers and release shared memory"""
+        self.running = False
+        for channel in self.channels:
+            channel.running = False
+        
+        self.stop_event.set()
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        
+        for slot in self.slots:
+            slot.close()
+            slot.unlink()
+
+def get_args():
+    parser = argparse.ArgumentParser(description='Multi-camera Pose Hub for Bubble Game')
+    parser.add_argument("--devices", type=int, nargs='+', default=[0],
+                        help="Camera device numbers, served as /camera/0, /camera/1, ...")
+    parser.add_argument("--width", type=int, default=640, help="Camera width")
+    parser.add_argument("--height", type=int, default=480, help="Camera height")
+    parser.add_argument("--host", type=str, default='localhost', help="WebSocket host")
+    parser.add_argument("--port", type=int, default=8765, help="WebSocket port")
+    parser.add_argument("--deadband", type=float, default=0.0,
+                        help="Minimum hand movement in pixels before a new update is sent")
+    return parser.parse_args()
+
+async def main():
+    args = get_args()
+    
+    hub = PoseHub(args.host, args.port, args.devices, args.width, args.height,
+                  config={'deadband_px': args.deadband})
+    
+    try:
+        await hub.start_server()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        hub.cleanup()
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Relay for the bubble game pose stream
+Subscribes to a pose server (or another relay) once and re-broadcasts its
+hand positions to any number of spectator clients, with the same protocol,
+per-client options and telemetry as the pose server itself. Several relay
+processes can share one port through SO_REUSEPORT, so the camera machine
+only ever serves one connection per relay process.
+"""
+import asyncio
+import websockets
+import json
+import argparse
+import multiprocessing as mp
+import time
+import numpy as np
+from pose_websocket_server import PoseWebSocketServer, LANDMARK_NAMES
+from utils import SUBPROTOCOL_BINARY, SUBPROTOCOL_BINARY_V1, SUBPROTOCOL_JSON
+
+# Seconds between reconnection attempts, doubling up to the maximum
+RECONNECT_MIN = 0.5
+RECONNECT_MAX = 10.0
+
+LANDMARK_INDEX = {name: i for i, name in enumerate(LANDMARK_NAMES)}
+
+class PoseRelay(PoseWebSocketServer):
+    """Pose server whose results come from an upstream pose server"""
+    
+    def __init__(self, upstream, host='localhost', port=8766, reuse_port=False):
+        super().__init__(host, port)
+        self.upstream = upstream
+        self.reuse_port = reuse_port
+        self.upstream_ws = None
+        # Upstream time.monotonic() + offset = local time.monotonic()
+        self.upstream_offset = None
+        self.upstream_messages = 0
+        self.upstream_connects = 0
+    
+    def update_demand(self):
+        """Pause the upstream subscription while no spectator wants results"""
+        had_demand = self.demand.is_set()
+        super().update_demand()
+        if self.upstream_ws is not None and self.demand.is_set() != had_demand:
+            self.track_control(self.send_upstream({
+                'type': 'configure', 'paused': not self.demand.is_set()}))
+    
+    async def send_upstream(self, message):
+        try:
+            await self.upstream_ws.send(json.dumps(message))
+        except (AttributeError, websockets.exceptions.ConnectionClosed):
+            # Reconnecting sends the current settings anyway
+            pass
+    
+    async def upstream_loop(self):
+        """Stay subscribed to the upstream server, reconnecting when it goes away"""
+        delay = RECONNECT_MIN
+        while self.running:
+            try:
+                async with websockets.connect(self.upstream,
+                                              subprotocols=[SUBPROTOCOL_JSON]) as websocket:
+                    self.upstream_ws = websocket
+                    self.upstream_connects += 1
+                    print(f"Subscribed to {self.upstream}")
+                    delay = RECONNECT_MIN
+                    # Landmarks arrive in our canvas pixels, so they need no rescaling
+                    await websocket.send(json.dumps({
+                        'type': 'configure',
+                        'canvas': {'width': self.config['canvas_width'],
+                                   'height': self.config['canvas_height']},
+                        'landmarks': 'all',
+                        'world': self.config['world_landmarks'],
+                        'clockSync': True,
+                        'paused': not self.demand.is_set()
+                    }))
+                    async for message in websocket:
+                        await self.handle_upstream_message(websocket, message)
+            except (OSError, websockets.exceptions.WebSocketException) as e:
+                print(f"Upstream {self.upstream} unavailable: {e}")
+            finally:
+                self.upstream_ws = None
+                self.upstream_offset = None
+            
+            if not self.running:
+                break
+            # Spectators should not keep seeing the last pose of a lost stream
+            if self.state == 'ready':
+                self.set_state('starting')
+            if self.present:
+                self.clear_pose_landmarks()
+                self.publish_hand_positions()
+                self.set_presence(False)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX)
+    
+    async def handle_upstream_message(self, websocket, message):
+        """Turn one upstream message into a local pose result or state change"""
+        received = time.monotonic()
+        try:
+            data = json.loads(message)
+        except (TypeError, ValueError):
+            return
+        if not isinstance(data, dict):
+            return
+        kind = data.get('type')
+        
+        if kind == 'handPositions':
+            # Downstream prediction is the relay's own (--output_rate)
+            if data.get('predicted'):
+                return
+            self.upstream_messages += 1
+            self.hand_positions = data['data']
+            self.landmarks = self.landmark_array(data.get('landmarks'))
+            self.world_landmarks = self.landmark_array(data.get('worldLandmarks'))
+            captured_at = data.get('capturedAt')
+            if captured_at is not None and self.upstream_offset is not None:
+                self.captured_at = captured_at + self.upstream_offset
+            else:
+                self.captured_at = received
+            self.publish_hand_positions()
+            if self.state != 'ready':
+                self.set_state('ready')
+        
+        elif kind == 'ping':
+            await websocket.send(json.dumps({
+                'type': 'pong', 'id': data.get('id'), 'clientTime': time.monotonic()}))
+        
+        elif kind == 'clock':
+            # The server reports our clock relative to its own
+            self.upstream_offset = data['offset']
+        
+        elif kind == 'presence':
+            self.set_presence(data['present'])
+        
+        elif kind == 'status':
+            # An upstream can be ready long before anyone steps into view
+            if data.get('state') and data['state'] != self.state:
+                self.set_state(data['state'])
+        
+        elif kind == 'error':
+            print(f"Upstream rejected the subscription: {data.get('message')}")
+    
+    def landmark_array(self, landmarks):
+        """{name: [x, y, z, visibility]} from the wire -> (33, 4) float32 array"""
+        if not landmarks:
+            return None
+        points = np.zeros((len(LANDMARK_NAMES), 4), dtype=np.float32)
+        for name, values in landmarks.items():
+            index = LANDMARK_INDEX.get(name)
+            if index is not None:
+                points[index] = values
+        return points
+    
+    def get_stats(self):
+        stats = super().get_stats()
+        stats['upstream'] = {
+            'url': self.upstream,
+            'connected': self.upstream_ws is not None,
+            'connects': self.upstream_connects,
+            'messages': self.upstream_messages,
+            'clock_offset_s': self.upstream_offset
+        }
+        return stats
+    
+    async def start_server(self):
+        """Serve spectators and keep the upstream subscription alive"""
+        print(f"Starting relay of {self.upstream} on {self.host}:{self.port}")
+        
+        self.start_broadcasting()
+        self.state = 'starting'
+        server = await websockets.serve(
+            self.register_client, self.host, self.port,
+            subprotocols=[SUBPROTOCOL_BINARY, SUBPROTOCOL_BINARY_V1, SUBPROTOCOL_JSON],
+            reuse_port=self.reuse_port
+        )
+        print(f"Relay running on ws://{self.host}:{self.port}")
+        
+        upstream_task = asyncio.create_task(self.upstream_loop())
+        try:
+            await server.wait_closed()
+        finally:
+            self.running = False
+            upstream_task.cancel()
+            self.cancel_controls()
+
+def get_args():
+    parser = argparse.ArgumentParser(description='Pose Relay for Bubble Game spectators')
+    parser.add_argument("--upstream", type=str, default='ws://localhost:8765',
+                        help="Pose server (or relay) to subscribe to")
+    parser.add_argument("--host", type=str, default='0.0.0.0', help="WebSocket host")
+    parser.add_argument("--port", type=int, default=8766, help="WebSocket port")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Relay processes sharing the port through SO_REUSEPORT")
+    parser.add_argument("--reuse_port", action='store_true',
+                        help="Share the port with relays started separately")
+    parser.add_argument("--canvas_width", type=int, default=1024, help="Canvas width")
+    parser.add_argument("--canvas_height", type=int, default=768, help="Canvas height")
+    parser.add_argument("--deadband", type=float, default=0.0,
+                        help="Minimum hand movement in pixels before a new update is sent")
+    parser.add_argument("--output_rate", type=float, default=0,
+                        help="Send filtered and predicted hand positions at this rate in Hz (0: one update per upstream result)")
+    parser.add_argument("--world_landmarks", action='store_true',
+                        help="Relay world landmarks (the upstream server must offer them)")
+    parser.add_argument("--kinematics", action='store_true',
+                        help="Offer hand velocity, acceleration and swipe/hit events to configured clients")
+    parser.add_argument("--metrics_port", type=int, default=0,
+                        help="Serve metrics on http://127.0.0.1:<port>/metrics, plus one port per extra process (0: disabled)")
+    return parser.parse_args()
+
+def run_relay(args, index):
+    """Entry point of one relay process"""
+    relay = PoseRelay(args.upstream, args.host, args.port,
+                      reuse_port=args.reuse_port or args.processes > 1)
+    relay.config['canvas_width'] = args.canvas_width
+    relay.config['canvas_height'] = args.canvas_height
+    relay.config['deadband_px'] = args.deadband
+    relay.config['output_rate_hz'] = args.output_rate
+    relay.config['world_landmarks'] = args.world_landmarks
+    relay.config['kinematics'] = args.kinematics
+    if args.metrics_port:
+        relay.start_metrics_server(args.metrics_port + index)
+    
+    try:
+        asyncio.run(relay.start_server())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        relay.cleanup()
+
+def main():
+    args = get_args()
+    
+    # Every process subscribes upstream once and accepts its share of spectators
+    ctx = mp.get_context('spawn')
+    workers = []
+    for index in range(1, args.processes):
+        worker = ctx.Process(target=run_relay, args=(args, index), daemon=True)
+        worker.start()
+        workers.append(worker)
+        print(f"Relay process started (pid: {worker.pid})")
+    
+    try:
+        run_relay(args, 0)
+    finally:
+        print("\nShutting down...")
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+
+if __name__ == '__main__':
+    main()
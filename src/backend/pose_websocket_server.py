@@ -10,29 +10,255 @@ import json
 import cv2 as cv
 import numpy as np
 import mediapipe as mp
-from utils import CvFpsCalc
+from utils import (AdaptivePose, ClockEstimator, CvFpsCalc, FrameGrabber,
+                   HandKinematics, HandPredictor, ImageSequenceSource,
+                   MotionGate, PreviewEncoder, RollingStats, SamplingProfiler,
+                   SessionRecorder, SharedFrameSource, SlowCallbackLog,
+                   StageTimer, SUBPROTOCOL_BINARY,
+                   SUBPROTOCOL_BINARY_V1, SUBPROTOCOL_JSON, SyntheticCamera,
+                   SyntheticPose, VideoFileSource, WIRE_VERSIONS,
+                   encode_hand_positions, scale_kinematics)
 import argparse
+import itertools
+import logging
+import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import deque, namedtuple
+
+# MediaPipe pose landmark names, in results.pose_landmarks.landmark order
+LANDMARK_NAMES = tuple(lm.name.lower() for lm in mp.solutions.pose.PoseLandmark)
+LEFT_WRIST = 15
+RIGHT_WRIST = 16
+
+# Landmark order as seen in a horizontally flipped frame: left and right swap
+MIRROR_ORDER = np.array([
+    LANDMARK_NAMES.index(name.replace('left_', 'right_') if name.startswith('left_')
+                         else name.replace('right_', 'left_'))
+    for name in LANDMARK_NAMES
+])
+
+# Clock sync pings sent in quick succession when a client enables it
+CLOCK_SYNC_BURST = 5
+CLOCK_SYNC_BURST_INTERVAL = 0.05
+
+# One published pose result. landmarks / world_landmarks are (33, 4) float32
+# arrays of x, y, z, visibility in canvas pixels / metres, or None.
+# captured_at / measured_at are time.monotonic() values. kinematics is
+# HandKinematics.update() output, ({hand: features}, [events]), or None.
+PoseResult = namedtuple('PoseResult', ['seq', 'captured_at', 'measured_at', 'hands',
+                                       'landmarks', 'world_landmarks', 'kinematics'])
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves PoseWebSocketServer.get_stats() as JSON on /metrics, and the
+    camera preview as MJPEG on /preview.mjpg when enabled"""
+    
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/preview.mjpg' and self.server.pose_server.preview is not None:
+            self.stream_preview(self.server.pose_server.preview)
+            return
+        if path != '/metrics':
+            self.send_error(404)
+            return
+        body = json.dumps(self.server.pose_server.get_stats()).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def stream_preview(self, preview):
+        """Send encoded preview frames until the viewer disconnects"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=frame')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        
+        # Frames are only produced while at least one viewer is subscribed
+        preview.subscribe()
+        try:
+            seq = preview.seq
+            while preview.running:
+                seq, jpeg = preview.wait(seq, timeout=1.0)
+                if jpeg is None:
+                    continue
+                self.wfile.write(b'--frame\r\nContent-Type: image/jpeg\r\n'
+                                 b'Content-Length: %d\r\n\r\n' % len(jpeg))
+                self.wfile.write(jpeg)
+                self.wfile.write(b'\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            preview.unsubscribe()
+    
+    def log_message(self, format, *args):
+        pass
+
+class ClientConnection:
+    """Bounded outbound queue and lag counters for one WebSocket client"""
+    
+    def __init__(self, websocket, queue_size, timer=None, stats_window=600):
+        self.websocket = websocket
+        self.timer = timer
+        # Binary wire format version from the subprotocol, None for JSON
+        self.wire_version = WIRE_VERSIONS.get(websocket.subprotocol)
+        # Position frames go stale, so a full queue drops its oldest entry
+        self.queue = deque(maxlen=queue_size)
+        self.ready = asyncio.Event()
+        self.sender = None
+        
+        self.sent = 0
+        self.dropped = 0
+        self.skipped = 0
+        # Frames produced since this client's last completed send
+        self.lag = 0
+        
+        # Landmark subscription: indices into LANDMARK_NAMES, plus world landmarks
+        self.landmarks = ()
+        self.world = False
+        # Opted in to kinematics fields (JSON only)
+        self.kinematics = False
+        
+        # Negotiated canvas (width, height), None for the server canvas, and
+        # send rate in Hz, 0 for every update
+        self.canvas = None
+        self.rate_hz = 0
+        self.next_due = 0.0
+        # Set while the latest result was skipped to respect rate_hz
+        self.deferred = False
+        # A paused client gets no results and does not keep the pipeline busy
+        self.paused = False
+        
+        # Clock sync (opt-in): outstanding ping id -> send time, the offset
+        # and round-trip estimate, and capture-to-send delays in milliseconds
+        self.clock_sync = None
+        self.pings = {}
+        self.clock = ClockEstimator()
+        self.delays = RollingStats(stats_window)
+    
+    def due(self, now):
+        """Check whether this client takes an update now, given its rate"""
+        if not self.rate_hz:
+            return True
+        interval = 1.0 / self.rate_hz
+        # Results arrive with some jitter; taking one slightly early keeps the
+        # average rate at rate_hz instead of slipping a whole source frame
+        if now < self.next_due - 0.1 * interval:
+            self.skipped += 1
+            return False
+        self.next_due = max(self.next_due, now - interval) + interval
+        return True
+    
+    def enqueue(self, message, captured_at=None):
+        """Queue a message without blocking the broadcaster"""
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append((message, captured_at))
+        self.lag += 1
+        self.ready.set()
+    
+    async def send_loop(self):
+        """Drain the queue at whatever pace this client can take"""
+        try:
+            while True:
+                await self.ready.wait()
+                self.ready.clear()
+                while self.queue:
+                    message, captured_at = self.queue.popleft()
+                    started = time.monotonic()
+                    await self.websocket.send(message)
+                    self.sent += 1
+                    self.lag = len(self.queue)
+                    
+                    sent_at = time.monotonic()
+                    if captured_at is not None:
+                        self.delays.add((sent_at - captured_at) * 1000.0)
+                    if self.timer is not None:
+                        self.timer.record('send', (sent_at - started) * 1000.0)
+                        if captured_at is not None:
+                            self.timer.record('capture_to_send',
+                                              (sent_at - captured_at) * 1000.0)
+        except websockets.exceptions.ConnectionClosed:
+            pass
 
 class PoseWebSocketServer:
     def __init__(self, host='localhost', port=8765):
         self.host = host
         self.port = port
-        self.clients = set()
+        # websocket -> ClientConnection
+        self.clients = {}
         
         # MediaPipe setup
         self.mp_pose = mp.solutions.pose
         self.pose = None
         self.cap = None
+        self.grabber = None
         
         # Pose detection config
         self.config = {
             'model_complexity': 1,
             'min_detection_confidence': 0.5,
             'min_tracking_confidence': 0.5,
+            # Crop to the last detection and step model_complexity/input size
+            # to stay within latency_budget_ms per frame
+            'adaptive_inference': False,
+            'latency_budget_ms': 25.0,
             'canvas_width': 1024,
-            'canvas_height': 768
+            'canvas_height': 768,
+            # Extract world landmarks (metres, hip-centred) for subscribers
+            'world_landmarks': False,
+            # Skip a send when neither hand moved more than this many pixels
+            'deadband_px': 0.0,
+            # Run pose.process on every Nth camera frame only
+            'inference_stride': 1,
+            # When > 0, send filtered positions at this rate and fill the gaps
+            # between inferences with predicted ones, up to max_prediction_ms
+            # after the capture of the last measured frame
+            'output_rate_hz': 0,
+            'max_prediction_ms': 100,
+            # Compute velocity, acceleration and gesture events per hand
+            'kinematics': False,
+            # Per-client outbound queue length, and how many frames a client
+            # may fall behind before it is disconnected
+            'client_queue_size': 2,
+            'max_client_lag': 120,
+            # Samples kept per stage for the latency percentiles
+            'stats_window': 600,
+            # Seconds between clock sync pings to clients that asked for them
+            'clock_sync_interval': 2.0,
+            # Debug preview on the metrics server: frames per second, width
+            # in pixels and JPEG quality
+            'preview_rate_hz': 5,
+            'preview_width': 320,
+            'preview_quality': 70,
+            # With no unpaused client, preview viewer or recording for
+            # idle_after_s seconds, suspend inference and capture at
+            # idle_capture_fps until someone subscribes again
+            'idle_when_unused': True,
+            'idle_after_s': 2.0,
+            'idle_capture_fps': 2.0,
+            # Skip inference on frames that barely differ from the last
+            # inferred one, and check for people at presence_check_hz while
+            # nobody is in view; every max_skip_s at least one frame is inferred
+            'motion_gate': False,
+            'presence_check_hz': 4.0,
+            'max_skip_s': 1.0,
+            # Sampling profiles of the pose thread and the event loop: output
+            # directory (None disables the "profile" control message),
+            # whether to profile right after startup, default length, format
+            # (collapsed or speedscope), sampling interval, and the event
+            # loop callback duration that gets reported
+            'profile_dir': None,
+            'profile_on_start': False,
+            'profile_seconds': 10.0,
+            'profile_format': 'collapsed',
+            'profile_interval_ms': 5.0,
+            'slow_callback_ms': 20.0,
+            # Periodically print frame buffer allocation counts
+            'debug': False
         }
         
         # Hand tracking state
@@ -40,106 +266,843 @@ class PoseWebSocketServer:
             'leftHand': {'x': 0, 'y': 0, 'visible': False},
             'rightHand': {'x': 0, 'y': 0, 'visible': False}
         }
+        # Full landmark arrays of the last detection, None while nobody is in view
+        self.landmarks = None
+        self.world_landmarks = None
+        # Whether the last inference found a person, None before the first
+        self.present = None
+        # Skips inference on static frames (config['motion_gate'])
+        self.gate = None
+        
+        # Latest pose result handed from the pose thread to the asyncio loop
+        self.seq_counter = itertools.count(1)
+        self.result_seq = 0
+        self.latest_result = None
+        self.result_event = None
+        self.last_sent = None
+        self.loop = None
+        # Control messages in flight; the loop only keeps weak references
+        self.control_sends = set()
+        
+        # Smooths measured positions and predicts between them (output_rate_hz > 0)
+        self.predictor = None
+        # Rolling hand history for kinematics fields (config['kinematics'])
+        self.kinematics = None
+        
+        # Per-stage latency telemetry
+        self.timer = StageTimer(self.config['stats_window'])
+        self.started_at = time.monotonic()
+        self.captured_at = None
+        self.metrics_server = None
+        self.frame_allocations = 0
+        
+        # Pose loop rate, set up by the pose thread
+        self.fps_calc = None
+        
+        # Demand-driven pipeline: the event loop sets demand while an
+        # unpaused client is connected. The pose thread reports 'active' or
+        # 'idle' and keeps the last transitions for the stats.
+        self.demand = threading.Event()
+        self.demand_since = None
+        self.pipeline_state = 'active'
+        self.pipeline_since = self.started_at
+        self.idle_seconds = 0.0
+        self.pipeline_transitions = deque(maxlen=20)
+        
+        # Optional on-disk log of every detection
+        self.recorder = None
+        # Profile in progress: sampler, slow callback log, output file and
+        # the clients waiting for the result
+        self.profiler = None
+        self.slow_callbacks = None
+        self.profile_base = None
+        self.profile_path = None
+        self.profile_format = None
+        self.profile_listeners = []
+        self.pose_thread = None
+        self.loop_thread = None
+        # Optional MJPEG debug preview, served by the metrics server
+        self.preview = None
+        
+        # Startup state reported to clients: None (not tracked), 'starting',
+        # 'ready' or 'failed', and startup phase timings in milliseconds
+        self.state = None
+        self.startup_ms = {}
         
         self.running = False
         
-    def init_camera_and_pose(self, device=0, width=640, height=480):
-        """Initialize camera and MediaPipe pose detection"""
+    def init_camera_and_pose(self, device=0, width=640, height=480,
+                             source='camera', realtime=True, fps=30.0):
+        """Initialize the frame source and pose detection
+        
+        source is 'camera' (uses device), 'shm[:<name>]' (frames from
+        camera_daemon.py, default name camera<device>), 'video:<path>',
+        'images:<glob or dir>' or 'synthetic[:<script>]'. Recorded sources
+        are paced at their frame rate when realtime is set, otherwise
+        replayed as fast as possible without dropping frames.
+        """
         try:
-            # Setup camera
+            kind, _, target = source.partition(':')
+            if kind not in ('camera', 'shm', 'video', 'images', 'synthetic'):
+                raise ValueError(f"Unknown source: {source}")
+            
+            # Opening a webcam and building the pose graph each take hundreds
+            # of milliseconds, so the source opens on a helper thread meanwhile
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                opening = executor.submit(self.open_source, kind, target, device,
+                                          width, height, realtime, fps)
+                started = time.monotonic()
+                self.create_pose(kind, target, realtime, fps)
+                loaded = time.monotonic()
+                self.startup_ms['model_load'] = round((loaded - started) * 1000.0, 1)
+                
+                # The first process() call initializes the graph; pay for it now
+                # rather than on the first camera frame
+                self.warm_up_pose(width, height)
+                self.startup_ms['warm_up'] = round((time.monotonic() - loaded) * 1000.0, 1)
+                
+                opening.result()
+            
+            if kind == 'camera':
+                print(f"Camera and pose detection initialized (device: {device})")
+            else:
+                print(f"Source and pose detection initialized ({source})")
+            print(f"Startup: source open {self.startup_ms['source_open']} ms, "
+                  f"model load {self.startup_ms['model_load']} ms, "
+                  f"warm-up {self.startup_ms['warm_up']} ms (concurrent with source open)")
+            return True
+            
+        except Exception as e:
+            print(f"Failed to initialize camera/pose: {e}")
+            return False
+    
+    def open_source(self, kind, target, device, width, height, realtime, fps):
+        """Open the frame source and its FrameGrabber"""
+        started = time.monotonic()
+        if kind == 'camera':
             self.cap = cv.VideoCapture(device)
             self.cap.set(cv.CAP_PROP_FRAME_WIDTH, width)
             self.cap.set(cv.CAP_PROP_FRAME_HEIGHT, height)
-            
-            # Setup MediaPipe
+            # Keep the driver queue short; FrameGrabber drops stale frames
+            self.cap.set(cv.CAP_PROP_BUFFERSIZE, 1)
+        elif kind == 'shm':
+            # Frames published by camera_daemon.py; the daemon owns the camera.
+            # FrameGrabber keeps frames past the ring's reuse window, so copy
+            self.cap = SharedFrameSource(target or f'camera{device}', copy=True)
+        elif kind == 'video':
+            self.cap = VideoFileSource(target, realtime)
+        elif kind == 'images':
+            self.cap = ImageSequenceSource(target, fps, realtime)
+        else:
+            self.cap = SyntheticCamera(width, height, fps, realtime)
+        if not self.cap.isOpened():
+            source = f"{kind}:{target}" if target else kind
+            raise RuntimeError(f"Could not open source: {source}")
+        self.grabber = FrameGrabber(self.cap, self.timer,
+                                    drop=kind in ('camera', 'shm') or realtime)
+        self.startup_ms['source_open'] = round((time.monotonic() - started) * 1000.0, 1)
+    
+    def create_pose(self, kind, target, realtime, fps):
+        """Build the pose model for a source kind"""
+        if kind == 'synthetic':
+            # Scripted landmarks, MediaPipe is not involved at all
+            self.pose = SyntheticPose(target or 'circles', fps, realtime)
+        elif self.config['adaptive_inference']:
+            self.pose = AdaptivePose(
+                self.mp_pose,
+                model_complexity=self.config['model_complexity'],
+                budget_ms=self.config['latency_budget_ms'],
+                min_detection_confidence=self.config['min_detection_confidence'],
+                min_tracking_confidence=self.config['min_tracking_confidence']
+            )
+        else:
             self.pose = self.mp_pose.Pose(
                 static_image_mode=False,
                 model_complexity=self.config['model_complexity'],
                 min_detection_confidence=self.config['min_detection_confidence'],
                 min_tracking_confidence=self.config['min_tracking_confidence']
             )
-            
-            print(f"Camera and pose detection initialized (device: {device})")
-            return True
-            
-        except Exception as e:
-            print(f"Failed to initialize camera/pose: {e}")
-            return False
     
-    def process_pose_landmarks(self, landmarks):
-        """Extract hand positions from pose landmarks"""
+    def warm_up_pose(self, width, height):
+        """Run one inference on a blank frame so graph setup is done up front"""
+        blank = np.zeros((height, width, 3), dtype=np.uint8)
+        if isinstance(self.pose, AdaptivePose):
+            self.pose.warm_up(blank)
+        elif not isinstance(self.pose, SyntheticPose):
+            # No person in the frame, so tracking starts from detection as usual
+            self.pose.process(blank)
+    
+    def process_pose_landmarks(self, landmarks, world_landmarks=None):
+        """Extract all landmarks and the hand positions from a pose result"""
         if not landmarks:
             return
-            
-        # MediaPipe landmark indices
-        LEFT_WRIST = 15
-        RIGHT_WRIST = 16
-        LEFT_INDEX = 19
-        RIGHT_INDEX = 20
         
         canvas_width = self.config['canvas_width']
         canvas_height = self.config['canvas_height']
         
-        # Process left hand
-        left_wrist = landmarks.landmark[LEFT_WRIST]
-        if left_wrist.visibility > 0.5:
-            # Mirror x coordinate for natural interaction
-            x = canvas_width - (left_wrist.x * canvas_width)
-            y = left_wrist.y * canvas_height
-            
-            self.hand_positions['leftHand'] = {
-                'x': max(0, min(canvas_width, x)),
-                'y': max(0, min(canvas_height, y)),
-                'visible': True
-            }
-        else:
-            self.hand_positions['leftHand']['visible'] = False
-            
-        # Process right hand
-        right_wrist = landmarks.landmark[RIGHT_WRIST]
-        if right_wrist.visibility > 0.5:
-            # Mirror x coordinate for natural interaction
-            x = canvas_width - (right_wrist.x * canvas_width)
-            y = right_wrist.y * canvas_height
-            
-            self.hand_positions['rightHand'] = {
-                'x': max(0, min(canvas_width, x)),
-                'y': max(0, min(canvas_height, y)),
-                'visible': True
-            }
-        else:
-            self.hand_positions['rightHand']['visible'] = False
+        # The camera frame is not flipped; the mirror effect is applied here
+        # in coordinate space instead. Mirroring the landmarks swaps their
+        # left/right labels, and its x flip cancels the canvas mirroring, so
+        # x ends up as the unflipped x scaled to the canvas.
+        points = np.array([(lm.x, lm.y, lm.z, lm.visibility)
+                           for lm in landmarks.landmark], dtype=np.float32)[MIRROR_ORDER]
+        points[:, 0] = np.clip(points[:, 0] * canvas_width, 0, canvas_width)
+        points[:, 1] = np.clip(points[:, 1] * canvas_height, 0, canvas_height)
+        points[:, 2] *= canvas_width
+        self.landmarks = points
+        
+        if world_landmarks is not None and self.config['world_landmarks']:
+            world = np.array([(lm.x, lm.y, lm.z, lm.visibility)
+                              for lm in world_landmarks.landmark], dtype=np.float32)
+            self.world_landmarks = world[MIRROR_ORDER]
+        
+        for hand, index in (('leftHand', LEFT_WRIST), ('rightHand', RIGHT_WRIST)):
+            x, y, _, visibility = points[index].tolist()
+            if visibility > 0.5:
+                self.hand_positions[hand] = {'x': x, 'y': y, 'visible': True}
+            else:
+                self.hand_positions[hand]['visible'] = False
+    
+    def clear_pose_landmarks(self):
+        """Forget the last detection once nobody is in view"""
+        self.landmarks = None
+        self.world_landmarks = None
+        for pos in self.hand_positions.values():
+            pos['visible'] = False
+    
+    def set_presence(self, present):
+        """Track whether a person is in view and tell clients when it changes"""
+        if present == self.present:
+            return
+        self.present = present
+        print("Person in view" if present else "No person in view")
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.send_to_all, self.presence_message())
+    
+    def presence_message(self):
+        """JSON presence message; present is false while nobody is in view"""
+        return json.dumps({'type': 'presence', 'present': self.present})
+    
+    def send_to_all(self, message):
+        """Send a control message to every client (runs on the event loop)"""
+        for client in list(self.clients.values()):
+            self.send_control(client, message)
+    
+    def send_control(self, client, message):
+        """Send a control message to one client without waiting for it"""
+        self.track_control(self.deliver_control(client.websocket, message))
+    
+    def track_control(self, coro):
+        """Run a control coroutine in the background, holding on to its task"""
+        task = asyncio.create_task(coro)
+        self.control_sends.add(task)
+        task.add_done_callback(self.control_sends.discard)
+        return task
+    
+    def cancel_controls(self):
+        """Abandon control messages and closes still in flight at shutdown"""
+        for task in list(self.control_sends):
+            task.cancel()
+    
+    async def deliver_control(self, websocket, message):
+        try:
+            await websocket.send(message)
+        except websockets.exceptions.ConnectionClosed:
+            # The client's handler cleans up after it
+            pass
+    
+    def publish_hand_positions(self):
+        """Hand a snapshot of the current positions to the broadcast loop"""
+        snapshot = {hand: dict(pos) for hand, pos in self.hand_positions.items()}
+        # itertools.count is safe to share with the prediction loop
+        self.result_seq = next(self.seq_counter)
+        measured_at = time.monotonic()
+        kinematics = None
+        if self.kinematics is not None:
+            kinematics = self.kinematics.update(self.captured_at or measured_at, snapshot)
+        self.latest_result = PoseResult(self.result_seq, self.captured_at,
+                                        measured_at, snapshot, self.landmarks,
+                                        self.world_landmarks, kinematics)
+        if self.recorder is not None and self.landmarks is not None:
+            self.recorder.append(self.captured_at, self.result_seq, self.landmarks)
+        if 'first_landmark' not in self.startup_ms and self.landmarks is not None:
+            self.startup_ms['first_landmark'] = round(
+                (time.monotonic() - self.started_at) * 1000.0, 1)
+            print(f"First landmarks {self.startup_ms['first_landmark']} ms after start")
+        
+        # Wake the broadcast loop from the pose thread
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.result_event.set)
+    
+    def within_deadband(self, previous, current):
+        """Check whether no hand moved or changed visibility since the last send"""
+        deadband = self.config['deadband_px']
+        for hand, pos in current.items():
+            prev = previous[hand]
+            if pos['visible'] != prev['visible']:
+                return False
+            if pos['visible'] and (abs(pos['x'] - prev['x']) > deadband or
+                                   abs(pos['y'] - prev['y']) > deadband):
+                return False
+        return True
+    
+    def status_message(self):
+        """JSON status message announcing the startup state"""
+        message = {'type': 'status', 'state': self.state}
+        if self.state != 'starting':
+            message['startupMs'] = self.startup_ms
+        return json.dumps(message)
+    
+    def set_state(self, state):
+        """Change the startup state and tell every connected client"""
+        self.state = state
+        self.send_to_all(self.status_message())
     
     async def register_client(self, websocket, path):
         """Register a new WebSocket client"""
-        self.clients.add(websocket)
+        # Clients can connect while the camera and model are still loading
+        try:
+            if self.state is not None:
+                await websocket.send(self.status_message())
+            if self.present is not None:
+                await websocket.send(self.presence_message())
+        except websockets.exceptions.ConnectionClosed:
+            return
+        
+        client = ClientConnection(websocket, self.config['client_queue_size'],
+                                  self.timer, self.config['stats_window'])
+        client.sender = asyncio.create_task(client.send_loop())
+        self.clients[websocket] = client
+        self.update_demand()
         print(f"Client connected: {websocket.remote_address}")
         
+        # Make sure the newcomer gets the current state even if nobody moves
+        self.send_latest_result(client)
+        
         try:
-            await websocket.wait_closed()
+            async for message in websocket:
+                await self.handle_client_message(client, message)
+        except websockets.exceptions.ConnectionClosed:
+            pass
         finally:
-            self.clients.remove(websocket)
-            print(f"Client disconnected: {websocket.remote_address}")
-    
-    async def broadcast_hand_positions(self):
-        """Broadcast hand positions to all connected clients"""
-        if self.clients:
-            message = json.dumps({
-                'type': 'handPositions',
-                'data': self.hand_positions,
-                'timestamp': time.time()
-            })
-            
-            # Send to all clients
-            disconnected = set()
-            for client in self.clients:
-                try:
-                    await client.send(message)
-                except websockets.exceptions.ConnectionClosed:
-                    disconnected.add(client)
-            
-            # Remove disconnected clients
-            self.clients -= disconnected
+            client.sender.cancel()
+            if client.clock_sync is not None:
+                client.clock_sync.cancel()
+            self.clients.pop(websocket, None)
+            self.update_demand()
+            print(f"Client disconnected: {websocket.remote_address} "
+                  f"(sent {client.sent}, dropped {client.dropped})")
+    
+    def update_demand(self):
+        """Wake or release the pose pipeline after clients came, went or paused"""
+        if any(not client.paused for client in self.clients.values()):
+            if not self.demand.is_set():
+                self.demand_since = time.monotonic()
+                self.demand.set()
+        else:
+            self.demand.clear()
+            self.forget_latest_result()
+    
+    def forget_latest_result(self):
+        """Drop the last result so a later client is not sent a pose from
+        before the lull (runs on the event loop)"""
+        self.latest_result = None
+        self.last_sent = None
+    
+    def wants_results(self):
+        """Whether anyone consumes pose results right now (called by the pose thread)"""
+        if not self.config['idle_when_unused'] or self.demand.is_set():
+            return True
+        return self.recorder is not None or bool(self.preview and self.preview.subscribers)
+    
+    def set_pipeline_state(self, state):
+        """Record an active/idle transition of the pose pipeline"""
+        now = time.monotonic()
+        if self.pipeline_state == 'idle':
+            self.idle_seconds += now - self.pipeline_since
+        self.pipeline_state = state
+        self.pipeline_since = now
+        self.pipeline_transitions.append(
+            {'state': state, 'at_s': round(now - self.started_at, 3)})
+        print(f"Pose pipeline {state}")
+    
+    async def handle_client_message(self, client, message):
+        """Handle a control message sent by a client"""
+        received = time.monotonic()
+        try:
+            request = json.loads(message)
+        except (TypeError, ValueError):
+            return
+        if not isinstance(request, dict):
+            return
+        
+        if request.get('type') == 'stats':
+            await client.websocket.send(json.dumps({
+                'type': 'stats',
+                'data': self.get_stats()
+            }))
+        
+        elif request.get('type') == 'subscribe':
+            # {"type": "subscribe", "landmarks": ["left_elbow", 13, ...] | "all", "world": bool}
+            await self.configure_client(client, {
+                'landmarks': request.get('landmarks') or [],
+                'world': request.get('world')
+            }, 'subscribed')
+        
+        elif request.get('type') == 'configure':
+            # {"type": "configure", "canvas": {"width": 390, "height": 844},
+            #  "rate": 15, "landmarks": [...] | "all", "world": bool,
+            #  "kinematics": bool, "clockSync": bool, "paused": bool}
+            # Omitted fields keep their current value
+            await self.configure_client(client, request, 'configured')
+        
+        elif request.get('type') == 'pong':
+            # {"type": "pong", "id": <ping id>, "clientTime": <client clock, seconds>}
+            await self.handle_pong(client, request, received)
+        
+        elif request.get('type') == 'profile':
+            # {"type": "profile", "seconds": 10, "format": "collapsed" | "speedscope"}
+            await self.request_profile(client, request)
+    
+    async def configure_client(self, client, request, reply_type):
+        """Validate and apply a client's output settings, then confirm them"""
+        error = None
+        indices = client.landmarks
+        canvas = client.canvas
+        rate_hz = client.rate_hz
+        
+        if 'landmarks' in request:
+            selection = request['landmarks'] or []
+            if selection == 'all':
+                selection = range(len(LANDMARK_NAMES))
+            indices = []
+            if not isinstance(selection, (list, range)):
+                error = f"Invalid landmarks: {selection}"
+                selection = []
+            for landmark in selection:
+                if isinstance(landmark, str) and landmark in LANDMARK_NAMES:
+                    indices.append(LANDMARK_NAMES.index(landmark))
+                elif (isinstance(landmark, int) and not isinstance(landmark, bool)
+                      and 0 <= landmark < len(LANDMARK_NAMES)):
+                    indices.append(landmark)
+                else:
+                    error = f"Unknown landmark: {landmark}"
+                    break
+            indices = tuple(indices)
+        
+        if error is None and 'canvas' in request:
+            size = request['canvas']
+            if size is None:
+                canvas = None
+            elif (isinstance(size, dict) and
+                  all(isinstance(size.get(key), (int, float))
+                      and not isinstance(size[key], bool) and 0 < size[key] <= 16384
+                      for key in ('width', 'height'))):
+                canvas = (float(size['width']), float(size['height']))
+            else:
+                error = f"Invalid canvas: {size}"
+        
+        if error is None and 'rate' in request:
+            rate = request['rate']
+            if isinstance(rate, (int, float)) and not isinstance(rate, bool) and rate >= 0:
+                rate_hz = float(rate)
+            else:
+                error = f"Invalid rate: {rate}"
+        
+        if error is not None:
+            await client.websocket.send(json.dumps({'type': 'error', 'message': error}))
+            return
+        
+        client.landmarks = indices
+        if 'world' in request:
+            client.world = bool(request['world']) and self.config['world_landmarks']
+        if 'kinematics' in request:
+            client.kinematics = bool(request['kinematics']) and self.config['kinematics']
+        if 'clockSync' in request:
+            if request['clockSync'] and client.clock_sync is None:
+                client.clock_sync = asyncio.create_task(self.clock_sync_loop(client))
+            elif not request['clockSync'] and client.clock_sync is not None:
+                client.clock_sync.cancel()
+                client.clock_sync = None
+        if 'paused' in request:
+            client.paused = bool(request['paused'])
+            self.update_demand()
+        client.canvas = canvas
+        client.rate_hz = rate_hz
+        
+        width, height = canvas or (self.config['canvas_width'], self.config['canvas_height'])
+        # Binary clients rely on this order for the points after the hands
+        await client.websocket.send(json.dumps({
+            'type': reply_type,
+            'landmarks': [LANDMARK_NAMES[i] for i in client.landmarks],
+            'world': client.world,
+            'kinematics': client.kinematics,
+            'clockSync': client.clock_sync is not None,
+            'paused': client.paused,
+            'canvas': {'width': width, 'height': height},
+            'rate': client.rate_hz
+        }))
+    
+    async def clock_sync_loop(self, client):
+        """Ping a client so it can map capturedAt onto its own clock
+        
+        A quick burst of pings gets a usable estimate within a fraction of a
+        second; after that one ping per clock_sync_interval tracks drift.
+        """
+        ping_id = 0
+        try:
+            while True:
+                ping_id += 1
+                # Forget pings that were never answered
+                client.pings.pop(ping_id - CLOCK_SYNC_BURST, None)
+                sent = time.monotonic()
+                client.pings[ping_id] = sent
+                await client.websocket.send(json.dumps({
+                    'type': 'ping', 'id': ping_id, 'serverTime': sent}))
+                if ping_id < CLOCK_SYNC_BURST:
+                    await asyncio.sleep(CLOCK_SYNC_BURST_INTERVAL)
+                else:
+                    await asyncio.sleep(self.config['clock_sync_interval'])
+        except websockets.exceptions.ConnectionClosed:
+            pass
+    
+    async def handle_pong(self, client, request, received):
+        """Fold a ping round trip into the client's estimates and report them"""
+        sent = client.pings.pop(request.get('id'), None)
+        client_time = request.get('clientTime')
+        if (sent is None or not isinstance(client_time, (int, float))
+                or isinstance(client_time, bool)):
+            return
+        if not client.clock.add(sent, float(client_time), received):
+            return
+        await client.websocket.send(json.dumps(self.clock_message(client)))
+    
+    def clock_message(self, client):
+        """Clock offset and delay estimates for one client
+        
+        offset maps server times onto the client's clock: a result captured
+        at capturedAt is client time capturedAt + offset. captureToReceiveMs
+        adds the median capture-to-send delay and the one-way network delay.
+        """
+        clock = client.clock
+        message = {
+            'type': 'clock',
+            'offset': clock.offset,
+            'rttMs': round(clock.rtt * 1000.0, 3),
+            'oneWayMs': round(clock.one_way * 1000.0, 3),
+            'samples': clock.count
+        }
+        capture_to_send = client.delays.percentiles((50,))[0]
+        if capture_to_send is not None:
+            message['captureToSendMs'] = round(capture_to_send, 3)
+            message['captureToReceiveMs'] = round(
+                capture_to_send + clock.one_way * 1000.0, 3)
+        return message
+    
+    async def request_profile(self, client, request):
+        """Start a profile for a client; it gets a "profile" message when done"""
+        seconds = request.get('seconds', self.config['profile_seconds'])
+        format = request.get('format', self.config['profile_format'])
+        error = None
+        if self.config['profile_dir'] is None:
+            error = "Profiling is disabled (start the server with --profile_dir)"
+        elif self.profiler is not None:
+            error = "A profile is already running"
+        elif (not isinstance(seconds, (int, float)) or isinstance(seconds, bool)
+              or not 0 < seconds <= 600):
+            error = f"Invalid profile length: {seconds}"
+        elif format not in ('collapsed', 'speedscope'):
+            error = f"Unknown profile format: {format}"
+        if error is not None:
+            await client.websocket.send(json.dumps({'type': 'error', 'message': error}))
+            return
+        
+        path = self.start_profile(seconds, format)
+        self.profile_listeners.append(client)
+        await client.websocket.send(json.dumps({
+            'type': 'profiling', 'seconds': seconds, 'path': path}))
+    
+    def start_profile(self, seconds, format='collapsed'):
+        """Sample the pose thread and the event loop for seconds, with asyncio
+        slow-callback warnings (runs on the event loop); returns the output path"""
+        threads = {'event_loop': self.loop_thread}
+        if self.pose_thread is not None:
+            threads['pose'] = self.pose_thread.ident
+        
+        directory = self.config['profile_dir'] or '.'
+        os.makedirs(directory, exist_ok=True)
+        extension = '.speedscope.json' if format == 'speedscope' else '.collapsed'
+        self.profile_base = os.path.join(
+            directory, f"pose-profile-{time.strftime('%Y%m%d-%H%M%S')}")
+        self.profile_path = self.profile_base + extension
+        self.profile_format = format
+        
+        # asyncio only times callbacks in debug mode, so it is on just as long
+        self.slow_callbacks = SlowCallbackLog()
+        logging.getLogger('asyncio').addHandler(self.slow_callbacks)
+        self.loop.slow_callback_duration = self.config['slow_callback_ms'] / 1000.0
+        self.loop.set_debug(True)
+        
+        self.profiler = SamplingProfiler(threads, self.config['profile_interval_ms'] / 1000.0)
+        self.profiler.start()
+        self.loop.call_later(seconds, self.finish_profile)
+        print(f"Profiling {' and '.join(threads)} for {seconds} s")
+        return self.profile_path
+    
+    def finish_profile(self):
+        """Stop sampling, write the profile and tell the clients that asked for it"""
+        profiler = self.profiler
+        profiler.stop()
+        self.loop.set_debug(False)
+        logging.getLogger('asyncio').removeHandler(self.slow_callbacks)
+        
+        path = self.profile_path
+        profiler.write(path, self.profile_format)
+        slow = self.slow_callbacks.messages
+        slow_path = None
+        if slow:
+            slow_path = self.profile_base + '.slow-callbacks.txt'
+            with open(slow_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(slow) + '\n')
+        print(f"Wrote profile of {profiler.samples} samples to {path} "
+              f"({len(slow)} slow callbacks)")
+        
+        message = json.dumps({
+            'type': 'profile',
+            'path': path,
+            'samples': profiler.samples,
+            'slowCallbacks': len(slow),
+            'slowCallbacksPath': slow_path
+        })
+        for client in self.profile_listeners:
+            if client.websocket in self.clients:
+                self.send_control(client, message)
+        self.profile_listeners = []
+        self.profiler = None
+        self.slow_callbacks = None
+    
+    def get_stats(self):
+        """Latency percentiles per stage plus frame and client counters"""
+        stats = {
+            'uptime_s': round(time.monotonic() - self.started_at, 1),
+            'pose_fps': self.fps_calc.peek() if self.fps_calc else None,
+            'state': self.state,
+            'startup_ms': self.startup_ms,
+            'pipeline': {
+                'state': self.pipeline_state,
+                'since_s': round(time.monotonic() - self.pipeline_since, 1),
+                'idle_s': round(self.idle_seconds + (
+                    time.monotonic() - self.pipeline_since
+                    if self.pipeline_state == 'idle' else 0.0), 1),
+                'transitions': list(self.pipeline_transitions)
+            },
+            'stages_ms': self.timer.snapshot(),
+            'results': self.result_seq,
+            'present': self.present,
+            'motion_gate': ({'inferred': self.gate.inferred, 'skipped': self.gate.skipped}
+                            if self.gate else None),
+            'dropped_frames': self.grabber.dropped if self.grabber else 0,
+            'frame_allocations': self.frame_allocations + (
+                self.grabber.allocations if self.grabber else 0),
+            'preview_viewers': self.preview.subscribers if self.preview else 0,
+            'profiling': self.profile_path if self.profiler else None,
+            'clients': [
+                {
+                    'address': str(client.websocket.remote_address),
+                    'sent': client.sent,
+                    'dropped': client.dropped,
+                    'skipped': client.skipped,
+                    'lag': client.lag,
+                    'rate_hz': client.rate_hz,
+                    'paused': client.paused,
+                    'capture_to_send_ms': client.delays.snapshot(),
+                    'rtt_ms': (round(client.clock.rtt * 1000.0, 3)
+                               if client.clock.rtt is not None else None),
+                    'clock_offset_s': client.clock.offset
+                }
+                for client in list(self.clients.values())
+            ]
+        }
+        if isinstance(self.pose, AdaptivePose):
+            complexity, max_side = self.pose.levels[self.pose.level]
+            stats['adaptive'] = {'model_complexity': complexity,
+                                 'input_size': max_side}
+        if self.recorder is not None:
+            stats['recording'] = {'path': self.recorder.path,
+                                  'records': self.recorder.count,
+                                  'dropped': self.recorder.dropped}
+        return stats
+    
+    def start_metrics_server(self, port):
+        """Serve get_stats() on http://127.0.0.1:<port>/metrics"""
+        self.metrics_server = ThreadingHTTPServer(('127.0.0.1', port), MetricsHandler)
+        self.metrics_server.pose_server = self
+        thread = threading.Thread(target=self.metrics_server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        print(f"Metrics available on http://127.0.0.1:{port}/metrics")
+        if self.preview is not None:
+            print(f"Camera preview available on http://127.0.0.1:{port}/preview.mjpg")
+    
+    def start_preview(self):
+        """Encode preview frames for viewers of /preview.mjpg"""
+        self.preview = PreviewEncoder(
+            rate_hz=self.config['preview_rate_hz'],
+            width=self.config['preview_width'],
+            quality=self.config['preview_quality'],
+            canvas=(self.config['canvas_width'], self.config['canvas_height']),
+            timer=self.timer)
+        self.preview.start()
+    
+    def start_recording(self, path):
+        """Log every detection to the session directory at path"""
+        self.recorder = SessionRecorder(
+            path, len(LANDMARK_NAMES),
+            canvas=(self.config['canvas_width'], self.config['canvas_height']))
+        self.recorder.start()
+        print(f"Recording session to {path}")
+    
+    def evict_client(self, client):
+        """Disconnect a client that fell too far behind"""
+        self.clients.pop(client.websocket, None)
+        self.update_demand()
+        client.sender.cancel()
+        print(f"Evicting slow client {client.websocket.remote_address}: "
+              f"lag {client.lag} frames, dropped {client.dropped}")
+        self.track_control(client.websocket.close(code=1013, reason='Client too slow'))
+    
+    def encode_message(self, wire_version, seq, timestamp, positions, predicted,
+                       indices=(), landmarks=None, world_landmarks=None,
+                       captured_at=None, kinematics=None):
+        """Serialize one handPositions message for a given format and subscription
+        
+        wire_version selects the binary format, None means JSON.
+        """
+        # Kinematics fields are JSON only
+        if wire_version is not None:
+            return encode_hand_positions(seq, timestamp, positions, predicted,
+                                         landmarks=landmarks, captured_at=captured_at,
+                                         version=wire_version)
+        
+        message = {
+            'type': 'handPositions',
+            'data': positions,
+            'seq': seq,
+            'predicted': predicted,
+            'timestamp': timestamp
+        }
+        if captured_at is not None:
+            # Server time.monotonic() of the camera frame (of the predicted
+            # instant for predicted results); clock sync maps it to the client
+            message['capturedAt'] = captured_at
+        # [x, y, z, visibility] per subscribed landmark
+        names = [LANDMARK_NAMES[i] for i in indices]
+        if landmarks is not None:
+            message['landmarks'] = dict(zip(names, landmarks.tolist()))
+        if world_landmarks is not None:
+            message['worldLandmarks'] = dict(zip(names, world_landmarks.tolist()))
+        if kinematics is not None:
+            features, events = kinematics
+            message['kinematics'] = features
+            if events:
+                message['events'] = events
+        return json.dumps(message)
+    
+    def project_to_canvases(self, canvases, positions, landmarks=None,
+                            kinematics=None):
+        """Rescale server-canvas coordinates to each (width, height) in one pass
+        
+        Returns {canvas: (positions, landmarks, kinematics)}. The server
+        canvas itself maps to the unmodified inputs.
+        """
+        base = (self.config['canvas_width'], self.config['canvas_height'])
+        projected = {canvas: (positions, landmarks, kinematics) for canvas in canvases
+                     if canvas is None or canvas == base}
+        others = [canvas for canvas in canvases if canvas not in projected]
+        if not others:
+            return projected
+        
+        # (K, 2) x and y scale factors, one row per canvas
+        scale = np.array(others, dtype=np.float32) / np.array(base, dtype=np.float32)
+        hands = np.array([(pos['x'], pos['y']) for pos in positions.values()],
+                         dtype=np.float32)
+        hands = (hands[None] * scale[:, None]).tolist()
+        points = None
+        if landmarks is not None:
+            # x, y follow the canvas size; z is in canvas-width units
+            factors = np.ones((len(others), 4), dtype=np.float32)
+            factors[:, :2] = scale
+            factors[:, 2] = scale[:, 0]
+            points = landmarks[None] * factors[:, None]
+        
+        for k, canvas in enumerate(others):
+            scaled = {hand: dict(pos, x=x, y=y)
+                      for (hand, pos), (x, y) in zip(positions.items(), hands[k])}
+            scaled_kinematics = None
+            if kinematics is not None:
+                sx, sy = scale[k].tolist()
+                scaled_kinematics = scale_kinematics(*kinematics, sx, sy)
+            projected[canvas] = (scaled, points[k] if points is not None else None,
+                                 scaled_kinematics)
+        return projected
+    
+    def broadcast_hand_positions(self, seq, positions, predicted=False,
+                                 landmarks=None, world_landmarks=None,
+                                 captured_at=None, kinematics=None, clients=None):
+        """Queue hand positions for every connected client that is due an update"""
+        if clients is None:
+            clients = list(self.clients.values())
+        if not clients:
+            return
+        
+        started = time.monotonic()
+        timestamp = time.time()
+        max_lag = self.config['max_client_lag']
+        
+        due = []
+        for client in clients:
+            if client.paused:
+                continue
+            if client.lag >= max_lag:
+                self.evict_client(client)
+            elif client.due(started):
+                client.deferred = False
+                due.append(client)
+            else:
+                client.deferred = True
+        if not due:
+            return
+        
+        projected = self.project_to_canvases({client.canvas for client in due},
+                                             positions, landmarks, kinematics)
+        
+        # Each (format, subscription, canvas) combination is encoded at most once
+        messages = {}
+        
+        # Each client drains its own queue, so a slow one delays nobody else
+        for client in due:
+            wire_version = client.wire_version
+            indices = client.landmarks if landmarks is not None else ()
+            world = client.world and world_landmarks is not None
+            with_kinematics = (client.kinematics and kinematics is not None and
+                               wire_version is None)
+            key = (wire_version, indices, world, with_kinematics, client.canvas)
+            message = messages.get(key)
+            if message is None:
+                hands, points, features = projected[client.canvas]
+                # Only the subscribed rows are ever serialized
+                selected = points[list(indices)] if indices else None
+                selected_world = None
+                if world and indices:
+                    selected_world = world_landmarks[list(indices)]
+                message = messages[key] = self.encode_message(
+                    wire_version, seq, timestamp, hands, predicted,
+                    indices, selected, selected_world, captured_at,
+                    features if with_kinematics else None)
+            # Predicted results are not camera frames, keep them out of the delays
+            client.enqueue(message, None if predicted else captured_at)
+        
+        self.timer.record('serialize', (time.monotonic() - started) * 1000.0)
     
     def pose_detection_loop(self):
         """Main pose detection loop running in separate thread"""
@@ -149,50 +1112,266 @@ class PoseWebSocketServer:
             
         print("Starting pose detection loop...")
         
+        # Capture runs on its own thread so inference always gets the newest frame
+        self.grabber.start()
+        frame_seq = 0
+        stride = max(1, self.config['inference_stride'])
+        
+        timer = self.timer
+        
+        # Reused RGB buffer; the mirror effect is applied to the landmarks
+        rgb_image = None
+        report_at = time.monotonic() + 5.0
+        # Time between processed frames, kept next to the stage timings
+        fps_calc = CvFpsCalc(self.config['stats_window'], timer, 'pose_loop')
+        self.fps_calc = fps_calc
+        reported_allocations = 0
+        
+        if self.config['motion_gate']:
+            self.gate = MotionGate(presence_check_hz=self.config['presence_check_hz'],
+                                   max_skip_s=self.config['max_skip_s'])
+        gate = self.gate
+        
+        idle = False
+        unused_since = None
+        # Set when demand returned, until the first fresh frame is processed
+        resumed_at = None
+        
         while self.running:
-            ret, image = self.cap.read()
-            if not ret:
+            if not self.wants_results():
+                now = time.monotonic()
+                if unused_since is None:
+                    unused_since = now
+                if not idle and now - unused_since >= self.config['idle_after_s']:
+                    idle = True
+                    self.grabber.throttle(self.config['idle_capture_fps'])
+                    self.set_pipeline_state('idle')
+                    # Results of the grace period are stale once we resume
+                    if self.loop is not None:
+                        self.loop.call_soon_threadsafe(self.forget_latest_result)
+                if idle:
+                    # Clients wake us through the event; preview viewers and
+                    # recordings are noticed on the next poll
+                    self.demand.wait(0.1)
+                    continue
+            else:
+                unused_since = None
+                if idle:
+                    idle = False
+                    resumed_at = time.monotonic()
+                    # Hub workers share the event but not the time it was set
+                    if self.demand.is_set() and self.demand_since is not None:
+                        resumed_at = self.demand_since
+                    self.grabber.throttle(0)
+                    # Skip the frame captured at the idle rate, take the next one
+                    frame_seq = self.grabber.seq
+                    fps_calc.reset()
+                    self.set_pipeline_state('active')
+            
+            frame_seq, image, captured_at = self.grabber.read(frame_seq + stride - 1)
+            if image is None:
                 continue
-                
-            # Flip image for mirror effect
-            image = cv.flip(image, 1)
+            started = time.monotonic()
+            fps_calc.get()
+            timer.record('frame_wait', (started - captured_at) * 1000.0)
+            
+            if gate is not None:
+                infer = gate.check(image, started, self.present is not False)
+                timer.record('motion_check', (time.monotonic() - started) * 1000.0)
+                if not infer:
+                    preview = self.preview
+                    if preview is not None and preview.wanted(started):
+                        preview.submit(image, self.landmarks)
+                    continue
+            self.captured_at = captured_at
             
-            # Convert BGR to RGB
-            rgb_image = cv.cvtColor(image, cv.COLOR_BGR2RGB)
+            # Convert BGR to RGB into the preallocated buffer
+            if rgb_image is None or rgb_image.shape != image.shape:
+                rgb_image = np.empty_like(image)
+                self.frame_allocations += 1
+            cv.cvtColor(image, cv.COLOR_BGR2RGB, dst=rgb_image)
+            converted = time.monotonic()
+            timer.record('convert', (converted - started) * 1000.0)
             
             # Process pose
             results = self.pose.process(rgb_image)
+            inferred = time.monotonic()
+            timer.record('inference', (inferred - converted) * 1000.0)
             
             # Extract hand positions
             if results.pose_landmarks:
-                self.process_pose_landmarks(results.pose_landmarks)
+                self.process_pose_landmarks(results.pose_landmarks,
+                                            results.pose_world_landmarks)
+                timer.record('extract', (time.monotonic() - inferred) * 1000.0)
+                self.publish_hand_positions()
+            elif self.present is not False:
+                # Hide the hands once instead of repeating the last positions
+                self.clear_pose_landmarks()
+                self.publish_hand_positions()
+            self.set_presence(bool(results.pose_landmarks))
             
-            # Small delay to prevent excessive CPU usage
-            time.sleep(0.016)  # ~60 FPS
+            if resumed_at is not None:
+                # From the subscription to the first result on a fresh frame
+                timer.record('resume', (time.monotonic() - resumed_at) * 1000.0)
+                resumed_at = None
+            
+            # The grabber reuses this frame, so the preview takes a copy
+            preview = self.preview
+            if preview is not None and preview.wanted(started):
+                preview.submit(image, self.landmarks)
+            
+            if self.config['debug'] and started >= report_at:
+                allocations = self.frame_allocations + self.grabber.allocations
+                print(f"Frame path allocations: {allocations - reported_allocations} "
+                      f"in the last 5 s ({allocations} total)")
+                reported_allocations = allocations
+                report_at = started + 5.0
+        
+        self.grabber.stop()
+    
+    def send_latest_result(self, client):
+        """Queue the latest result for one client only, bypassing the deadband"""
+        result = self.latest_result
+        if result is None:
+            return
+        kinematics = result.kinematics
+        if kinematics is not None:
+            # Events were already delivered with the original send
+            kinematics = (kinematics[0], [])
+        self.broadcast_hand_positions(result.seq, result.hands,
+                                      landmarks=result.landmarks,
+                                      world_landmarks=result.world_landmarks,
+                                      captured_at=result.captured_at,
+                                      kinematics=kinematics, clients=[client])
+    
+    def send_result(self, seq, positions, predicted=False, landmarks=None,
+                    world_landmarks=None, captured_at=None, kinematics=None):
+        """Broadcast a result unless the hands are effectively still"""
+        if (self.last_sent is not None and
+                self.within_deadband(self.last_sent, positions)):
+            # Rate-limited clients that skipped the last change still need it,
+            # and still hands say nothing about other landmarks or new events
+            events = kinematics is not None and bool(kinematics[1])
+            exempt = [client for client in self.clients.values()
+                      if client.deferred or
+                      (client.landmarks and landmarks is not None) or
+                      (events and client.kinematics and client.wire_version is None)]
+            if exempt:
+                self.broadcast_hand_positions(seq, positions, predicted, landmarks,
+                                              world_landmarks, captured_at,
+                                              kinematics, exempt)
+            return
+        self.broadcast_hand_positions(seq, positions, predicted, landmarks,
+                                      world_landmarks, captured_at, kinematics)
+        self.last_sent = positions
     
     async def broadcast_loop(self):
-        """Broadcast hand positions at regular intervals"""
+        """Broadcast each new pose result once, as soon as it is published"""
+        last_seq = 0
+        
         while self.running:
-            await self.broadcast_hand_positions()
-            await asyncio.sleep(0.016)  # ~60 FPS
+            await self.result_event.wait()
+            self.result_event.clear()
+            
+            result = self.latest_result
+            if result is None or result.seq == last_seq:
+                continue
+            last_seq = result.seq
+            
+            positions = result.hands
+            if self.predictor is not None:
+                # The hands were where they are at capture, not after inference
+                positions = self.predictor.update(
+                    result.captured_at or result.measured_at, positions)
+            self.send_result(result.seq, positions,
+                             landmarks=result.landmarks,
+                             world_landmarks=result.world_landmarks,
+                             captured_at=result.captured_at,
+                             kinematics=result.kinematics)
     
-    async def start_server(self):
-        """Start the WebSocket server"""
-        print(f"Starting WebSocket server on {self.host}:{self.port}")
+    async def prediction_loop(self):
+        """Fill the gaps between inferences with predicted positions"""
+        period = 1.0 / self.config['output_rate_hz']
+        width = self.config['canvas_width']
+        height = self.config['canvas_height']
+        next_tick = time.monotonic()
         
-        # Start pose detection in separate thread
+        while self.running:
+            next_tick += period
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+            
+            now = time.monotonic()
+            result = self.latest_result
+            # A freshly published measurement covers this tick
+            if result is None or now - result.measured_at < period:
+                continue
+            
+            predicted = self.predictor.predict(now, width, height)
+            if not predicted:
+                continue
+            positions = dict(self.last_sent or result.hands)
+            positions.update(predicted)
+            self.send_result(next(self.seq_counter), positions, predicted=True,
+                             captured_at=now)
+    
+    def start_broadcasting(self):
+        """Attach to the running event loop and start the broadcast task"""
+        # The pose thread signals new results through this event
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        self.result_event = asyncio.Event()
         self.running = True
-        pose_thread = threading.Thread(target=self.pose_detection_loop)
-        pose_thread.daemon = True
-        pose_thread.start()
         
-        # Start WebSocket server and broadcast loop
-        server = await websockets.serve(self.register_client, self.host, self.port)
+        if self.config['kinematics']:
+            self.kinematics = HandKinematics()
+        if self.config['output_rate_hz'] > 0:
+            self.predictor = HandPredictor(
+                max_prediction=self.config['max_prediction_ms'] / 1000.0)
+            asyncio.create_task(self.prediction_loop())
+        return asyncio.create_task(self.broadcast_loop())
+    
+    async def start_server(self, **source):
+        """Start the WebSocket server
+        
+        With source (init_camera_and_pose arguments), the port is bound first
+        and the source and model are loaded afterwards, so clients can connect
+        straight away and follow the startup state.
+        """
+        print(f"Starting WebSocket server on {self.host}:{self.port}")
         
-        # Start broadcasting loop
-        broadcast_task = asyncio.create_task(self.broadcast_loop())
+        broadcast_task = self.start_broadcasting()
+        if source:
+            self.state = 'starting'
         
+        # Start WebSocket server
+        server = await websockets.serve(
+            self.register_client, self.host, self.port,
+            subprotocols=[SUBPROTOCOL_BINARY, SUBPROTOCOL_BINARY_V1, SUBPROTOCOL_JSON]
+        )
+        self.startup_ms['port_bound'] = round((time.monotonic() - self.started_at) * 1000.0, 1)
         print(f"Server running on ws://{self.host}:{self.port}")
+        
+        if source:
+            ready = await self.loop.run_in_executor(
+                None, lambda: self.init_camera_and_pose(**source))
+            if not ready:
+                self.set_state('failed')
+                server.close()
+                await server.wait_closed()
+                self.running = False
+                return False
+            self.startup_ms['ready'] = round((time.monotonic() - self.started_at) * 1000.0, 1)
+            self.set_state('ready')
+            print(f"Ready {self.startup_ms['ready']} ms after start")
+        
+        # Start pose detection in separate thread
+        self.pose_thread = threading.Thread(target=self.pose_detection_loop)
+        self.pose_thread.daemon = True
+        self.pose_thread.start()
+        
+        if self.config['profile_on_start']:
+            self.start_profile(self.config['profile_seconds'], self.config['profile_format'])
+        
         print("Connect your bubble game to start pose detection!")
         
         try:
@@ -201,13 +1380,28 @@ class PoseWebSocketServer:
             print("\nShutting down server...")
         finally:
             self.running = False
+            self.cancel_controls()
+            if self.grabber:
+                self.grabber.stop()
             if self.cap:
                 self.cap.release()
             cv.destroyAllWindows()
+        return True
     
     def cleanup(self):
         """Clean up resources"""
         self.running = False
+        if self.preview:
+            self.preview.stop()
+        if self.metrics_server:
+            self.metrics_server.shutdown()
+            self.metrics_server = None
+        if self.recorder:
+            self.recorder.close()
+            print(f"Recorded {self.recorder.count} detections to {self.recorder.path}")
+            self.recorder = None
+        if self.grabber:
+            self.grabber.stop()
         if self.cap:
             self.cap.release()
         cv.destroyAllWindows()
@@ -215,10 +1409,53 @@ class PoseWebSocketServer:
 def get_args():
     parser = argparse.ArgumentParser(description='Pose WebSocket Server for Bubble Game')
     parser.add_argument("--device", type=int, default=0, help="Camera device number")
+    parser.add_argument("--source", type=str, default='camera',
+                        help="camera, shm[:<name>], video:<path>, images:<glob or dir> or synthetic[:circles|swipe|still|random]")
+    parser.add_argument("--fps", type=float, default=30.0,
+                        help="Frame rate of image sequence and synthetic sources")
+    parser.add_argument("--fast", action='store_true',
+                        help="Replay non-camera sources as fast as possible instead of in real time")
     parser.add_argument("--width", type=int, default=640, help="Camera width")
     parser.add_argument("--height", type=int, default=480, help="Camera height")
     parser.add_argument("--host", type=str, default='localhost', help="WebSocket host")
     parser.add_argument("--port", type=int, default=8765, help="WebSocket port")
+    parser.add_argument("--deadband", type=float, default=0.0,
+                        help="Minimum hand movement in pixels before a new update is sent")
+    parser.add_argument("--adaptive", action='store_true',
+                        help="Crop to the last detection and adapt model complexity to the latency budget")
+    parser.add_argument("--latency_budget", type=float, default=25.0,
+                        help="Per-frame inference budget in milliseconds for --adaptive")
+    parser.add_argument("--inference_stride", type=int, default=1,
+                        help="Run pose detection on every Nth camera frame")
+    parser.add_argument("--output_rate", type=float, default=0,
+                        help="Send filtered and predicted hand positions at this rate in Hz (0: one update per inference)")
+    parser.add_argument("--world_landmarks", action='store_true',
+                        help="Also offer world landmarks (metres) to subscribed clients")
+    parser.add_argument("--kinematics", action='store_true',
+                        help="Offer hand velocity, acceleration and swipe/hit events to configured clients")
+    parser.add_argument("--motion_gate", action='store_true',
+                        help="Skip pose detection on static frames and check for people at a low rate while nobody is in view")
+    parser.add_argument("--keep_running", action='store_true',
+                        help="Keep detecting at full rate while no client is connected")
+    parser.add_argument("--profile", type=float, default=0,
+                        help="Profile the pose thread and the event loop for this many seconds after startup")
+    parser.add_argument("--profile_dir", type=str, default=None,
+                        help="Directory for profiles; also lets clients request them with a profile message")
+    parser.add_argument("--profile_format", type=str, default='collapsed',
+                        choices=['collapsed', 'speedscope'],
+                        help="Collapsed stacks (flamegraph.pl, speedscope) or speedscope JSON")
+    parser.add_argument("--debug", action='store_true',
+                        help="Print frame buffer allocation counts every 5 seconds")
+    parser.add_argument("--metrics_port", type=int, default=0,
+                        help="Serve latency metrics on http://127.0.0.1:<port>/metrics (0: disabled)")
+    parser.add_argument("--preview", action='store_true',
+                        help="Serve an MJPEG camera preview with landmarks on the metrics port")
+    parser.add_argument("--preview_rate", type=float, default=5.0,
+                        help="Preview frames per second")
+    parser.add_argument("--preview_width", type=int, default=320,
+                        help="Preview width in pixels")
+    parser.add_argument("--record", type=str, default=None,
+                        help="Record every detection to this session directory")
     return parser.parse_args()
 
 async def main():
@@ -226,15 +1463,40 @@ async def main():
     
     # Create server instance
     server = PoseWebSocketServer(args.host, args.port)
+    server.config['deadband_px'] = args.deadband
+    server.config['adaptive_inference'] = args.adaptive
+    server.config['latency_budget_ms'] = args.latency_budget
+    server.config['inference_stride'] = args.inference_stride
+    server.config['output_rate_hz'] = args.output_rate
+    server.config['world_landmarks'] = args.world_landmarks
+    server.config['kinematics'] = args.kinematics
+    server.config['idle_when_unused'] = not args.keep_running
+    server.config['motion_gate'] = args.motion_gate
+    server.config['profile_dir'] = args.profile_dir
+    server.config['profile_format'] = args.profile_format
+    if args.profile > 0:
+        server.config['profile_on_start'] = True
+        server.config['profile_seconds'] = args.profile
+    server.config['debug'] = args.debug
     
-    # Initialize camera and pose detection
-    if not server.init_camera_and_pose(args.device, args.width, args.height):
-        print("Failed to initialize. Exiting...")
-        return
+    server.config['preview_rate_hz'] = args.preview_rate
+    server.config['preview_width'] = args.preview_width
+    if args.preview:
+        if args.metrics_port:
+            server.start_preview()
+        else:
+            print("--preview needs --metrics_port; preview disabled")
+    if args.metrics_port:
+        server.start_metrics_server(args.metrics_port)
+    if args.record:
+        server.start_recording(args.record)
     
     try:
-        # Start the server
-        await server.start_server()
+        # Bind the port, then initialize camera and pose detection
+        if not await server.start_server(device=args.device, width=args.width,
+                                         height=args.height, source=args.source,
+                                         realtime=not args.fast, fps=args.fps):
+            print("Failed to initialize. Exiting...")
     except KeyboardInterrupt:
         print("\nShutting down...")
     finally:
@@ -0,0 +1,60 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.framegrabber import FrameGrabber  # noqa: E402
+
+
+class CountingSource(object):
+    """Capture source whose frames hold their own 1-based number"""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.count = 0
+
+    def read(self, buffer=None):
+        if self.count >= self.frames:
+            return False, None
+        self.count += 1
+        if buffer is None:
+            buffer = np.empty((2, 2, 3), dtype=np.uint8)
+        buffer[...] = self.count % 256
+        return True, buffer
+
+
+def test_no_drop_with_stride():
+    source = CountingSource(40)
+    grabber = FrameGrabber(source, drop=False)
+    grabber.start()
+    try:
+        stride = 2
+        frame_seq = 0
+        seen = []
+        for _ in range(10):
+            frame_seq, frame, _ = grabber.read(frame_seq + stride - 1, timeout=2.0)
+            assert frame is not None
+            assert frame[0, 0, 0] == frame_seq
+            seen.append(frame_seq)
+    finally:
+        grabber.stop()
+
+    assert seen == list(range(2, 22, 2))
+    # Frames passed over on request are not counted as dropped
+    assert grabber.dropped == 0
+
+
+def test_timeout_keeps_read_seq():
+    source = CountingSource(3)
+    grabber = FrameGrabber(source, drop=False)
+    grabber.start()
+    try:
+        frame_seq, frame, _ = grabber.read(0, timeout=2.0)
+        assert (frame_seq, frame is not None) == (1, True)
+        frame_seq, frame, _ = grabber.read(frame_seq + 4, timeout=0.2)
+        assert frame is None
+        assert frame_seq == 1
+    finally:
+        grabber.stop()
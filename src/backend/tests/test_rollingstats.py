@@ -0,0 +1,57 @@
+import os
+import sys
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.rollingstats import RollingStats  # noqa: E402
+
+
+def test_window_statistics():
+    stats = RollingStats(window=100)
+    values = np.random.default_rng(0).exponential(10.0, 250)
+    for value in values:
+        stats.add(float(value))
+
+    window = values[-100:]
+    assert stats.size == 100
+    assert abs(stats.mean - window.mean()) < 1e-9
+    assert stats.max == window.max()
+    p50, p99 = stats.percentiles((50, 99))
+    assert abs(p50 - np.percentile(window, 50)) / np.percentile(window, 50) < 0.1
+    assert p99 <= window.max()
+
+
+def test_empty_snapshot():
+    stats = RollingStats(window=10)
+    assert stats.max is None
+    assert stats.snapshot() is None
+    assert stats.percentiles((50,)) == [None]
+
+
+def test_snapshot_while_adding():
+    # Decreasing then increasing values make add() empty the maxima queue
+    stats = RollingStats(window=50)
+    stop = threading.Event()
+
+    def writer():
+        value = 0
+        while not stop.is_set():
+            value = (value + 7) % 1000
+            stats.add(float(value))
+
+    thread = threading.Thread(target=writer)
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    thread.start()
+    try:
+        for _ in range(20000):
+            summary = stats.snapshot()
+            if summary is not None:
+                assert summary['max'] >= summary['p50']
+    finally:
+        stop.set()
+        thread.join()
+        sys.setswitchinterval(old_interval)
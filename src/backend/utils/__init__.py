@@ -1,3 +1,35 @@
+from .adaptivepose import AdaptivePose
+from .clocksync import ClockEstimator
 from .cvfpscalc import CvFpsCalc
+from .framegrabber import FrameGrabber
+from .framering import FrameRing, SharedFrameSource
+from .handkinematics import HandKinematics, scale_kinematics
+from .handpredictor import HandPredictor
+from .handslot import HandPositionSlot
+from .motiongate import MotionGate
+from .pictogram import PictogramRenderer, landmarks_to_array
+from .preview import PreviewEncoder
+from .profiler import SamplingProfiler, SlowCallbackLog
+from .rollingstats import RollingStats
+from .sessionlog import SessionReader, SessionRecorder
+from .sinks import ImageSequenceSink, VideoFileSink, open_frame_sink
+from .sources import (ImageSequenceSource, SyntheticCamera, SyntheticPose,
+                      VideoFileSource)
+from .stagetimer import StageTimer
+from .wireformat import (SUBPROTOCOL_BINARY, SUBPROTOCOL_BINARY_V1,
+                         SUBPROTOCOL_JSON, WIRE_VERSIONS,
+                         decode_hand_positions, encode_hand_positions)
 
-__all__ = ['CvFpsCalc']
\ No newline at end of file
+__all__ = [
+    'AdaptivePose', 'ClockEstimator', 'CvFpsCalc', 'FrameGrabber', 'FrameRing', 'HandKinematics',
+    'HandPositionSlot', 'HandPredictor', 'ImageSequenceSink',
+    'ImageSequenceSource', 'MotionGate', 'PictogramRenderer', 'PreviewEncoder',
+    'RollingStats', 'SamplingProfiler', 'SessionReader', 'SessionRecorder',
+    'SharedFrameSource', 'SlowCallbackLog',
+    'StageTimer', 'SyntheticCamera', 'SyntheticPose', 'VideoFileSink',
+    'VideoFileSource',
+    'SUBPROTOCOL_BINARY', 'SUBPROTOCOL_BINARY_V1', 'SUBPROTOCOL_JSON',
+    'WIRE_VERSIONS',
+    'decode_hand_positions', 'encode_hand_positions', 'landmarks_to_array',
+    'open_frame_sink', 'scale_kinematics',
+]
@@ -0,0 +1,152 @@
+import time
+
+import cv2 as cv
+import numpy as np
+
+
+class AdaptivePose(object):
+    """MediaPipe Pose wrapper that crops to the last detection and trades
+    model quality for latency.
+
+    Quality levels run from cheapest to best as (model_complexity, longest
+    input side) pairs, None meaning the crop is not downscaled. The level
+    steps down while the smoothed per-frame time is over budget and back up
+    once there is comfortable headroom. Landmarks are mapped back to
+    full-frame normalized coordinates, so callers see the same results as
+    from mp.solutions.pose.Pose.process().
+    """
+
+    SIDES = (256, 384, None)
+
+    def __init__(self, mp_pose, model_complexity=1, budget_ms=25.0,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 margin=0.25, settle_frames=15):
+        self._mp_pose = mp_pose
+        self._pose_kwargs = {
+            'static_image_mode': False,
+            'min_detection_confidence': min_detection_confidence,
+            'min_tracking_confidence': min_tracking_confidence,
+        }
+        self._models = {}
+
+        self.levels = [(complexity, side)
+                       for complexity in range(model_complexity + 1)
+                       for side in self.SIDES]
+        self.level = len(self.levels) - 1
+        self.budget_ms = budget_ms
+        self.latency_ms = None
+
+        self._margin = margin
+        self._settle_frames = settle_frames
+        self._frames_at_level = 0
+        # Crop in normalized full-frame coordinates, None for the whole frame
+        self.roi = None
+
+    def _model(self, complexity):
+        # Building a graph is slow, so every complexity is built once and kept
+        model = self._models.get(complexity)
+        if model is None:
+            model = self._mp_pose.Pose(model_complexity=complexity,
+                                       **self._pose_kwargs)
+            self._models[complexity] = model
+        return model
+
+    def warm_up(self, rgb_image):
+        """Build every model and run it once, leaving the level and EMA alone"""
+        for complexity in sorted({complexity for complexity, _ in self.levels}):
+            self._model(complexity).process(rgb_image)
+
+    def process(self, rgb_image):
+        start = time.perf_counter()
+        height, width = rgb_image.shape[:2]
+        complexity, max_side = self.levels[self.level]
+
+        if self.roi is None:
+            x0, y0, x1, y1 = 0, 0, width, height
+        else:
+            x0 = int(self.roi[0] * width)
+            y0 = int(self.roi[1] * height)
+            x1 = int(np.ceil(self.roi[2] * width))
+            y1 = int(np.ceil(self.roi[3] * height))
+        crop_width, crop_height = x1 - x0, y1 - y0
+
+        crop = rgb_image[y0:y1, x0:x1]
+        scale = 1.0
+        if max_side is not None:
+            scale = min(1.0, max_side / max(crop_width, crop_height))
+        if scale < 1.0:
+            size = (max(1, round(crop_width * scale)),
+                    max(1, round(crop_height * scale)))
+            crop = cv.resize(crop, size, interpolation=cv.INTER_AREA)
+        else:
+            crop = np.ascontiguousarray(crop)
+
+        results = self._model(complexity).process(crop)
+
+        if results.pose_landmarks:
+            # Crop-relative -> full-frame normalized coordinates
+            if self.roi is not None:
+                sx = crop_width / width
+                sy = crop_height / height
+                ox = x0 / width
+                oy = y0 / height
+                for landmark in results.pose_landmarks.landmark:
+                    landmark.x = ox + landmark.x * sx
+                    landmark.y = oy + landmark.y * sy
+                    landmark.z = landmark.z * sx
+            self._update_roi(results.pose_landmarks)
+        else:
+            # Lost the person: search the whole frame again
+            self.roi = None
+
+        self._update_level((time.perf_counter() - start) * 1000.0)
+        return results
+
+    def _update_roi(self, landmarks):
+        points = np.clip(
+            np.array([(lm.x, lm.y) for lm in landmarks.landmark]), 0.0, 1.0)
+        bx0, by0 = points.min(axis=0).tolist()
+        bx1, by1 = points.max(axis=0).tolist()
+
+        # Keep the current crop while the person stays inside it and still
+        # fills a fair share of it; moving it every frame upsets tracking
+        if self.roi is not None:
+            rx0, ry0, rx1, ry1 = self.roi
+            inside = bx0 >= rx0 and by0 >= ry0 and bx1 <= rx1 and by1 <= ry1
+            fill = ((bx1 - bx0) * (by1 - by0)) / ((rx1 - rx0) * (ry1 - ry0))
+            if inside and fill > 0.25:
+                return
+
+        pad_x = max(bx1 - bx0, 0.1) * self._margin
+        pad_y = max(by1 - by0, 0.1) * self._margin
+        self.roi = (max(0.0, bx0 - pad_x), max(0.0, by0 - pad_y),
+                    min(1.0, bx1 + pad_x), min(1.0, by1 + pad_y))
+
+    def _update_level(self, elapsed_ms):
+        if self.latency_ms is None:
+            self.latency_ms = elapsed_ms
+        else:
+            self.latency_ms += 0.2 * (elapsed_ms - self.latency_ms)
+
+        self._frames_at_level += 1
+        if self._frames_at_level < self._settle_frames:
+            return
+
+        if self.latency_ms > self.budget_ms and self.level > 0:
+            self._set_level(self.level - 1)
+        elif (self.latency_ms < 0.6 * self.budget_ms and
+                self.level < len(self.levels) - 1):
+            self._set_level(self.level + 1)
+
+    def _set_level(self, level):
+        self.level = level
+        self._frames_at_level = 0
+        self.latency_ms = None
+        complexity, max_side = self.levels[level]
+        print(f"Adaptive inference: model_complexity={complexity}, "
+              f"input={max_side or 'full'}")
+
+    def close(self):
+        for model in self._models.values():
+            model.close()
+        self._models.clear()
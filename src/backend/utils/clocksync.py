@@ -0,0 +1,39 @@
+from collections import deque
+
+
+class ClockEstimator(object):
+    """Round-trip time and clock offset of one client from ping/pong samples.
+
+    The server stamps a ping with its time.monotonic(), the client echoes
+    it with its own clock reading, and the server notes when the pong came
+    back. Assuming the client answered halfway through the round trip,
+    offset = client_time - (sent + received) / 2. Queueing only ever adds
+    delay, so the sample with the smallest round trip in the window is the
+    most trustworthy one and provides both estimates.
+    """
+
+    def __init__(self, window=8):
+        # (rtt, offset) of the most recent exchanges
+        self._samples = deque(maxlen=window)
+        self.rtt = None
+        self.offset = None
+        self.count = 0
+
+    def add(self, sent, client_time, received):
+        """Add one exchange, all times in seconds; returns False if it is invalid"""
+        rtt = received - sent
+        if rtt < 0:
+            return False
+        self._samples.append((rtt, client_time - (sent + received) / 2.0))
+        self.rtt, self.offset = min(self._samples)
+        self.count += 1
+        return True
+
+    @property
+    def one_way(self):
+        """Estimated server-to-client network delay in seconds"""
+        return self.rtt / 2.0 if self.rtt is not None else None
+
+    def to_client(self, server_time):
+        """Map a server time.monotonic() reading onto the client's clock"""
+        return server_time + self.offset if self.offset is not None else None
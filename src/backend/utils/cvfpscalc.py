@@ -1,21 +1,36 @@
-from collections import deque
 import cv2 as cv
 
+from .rollingstats import RollingStats
+
 
 class CvFpsCalc(object):
-    def __init__(self, buffer_len=1):
+    def __init__(self, buffer_len=1, timer=None, probe='frame_interval'):
         self._start_tick = cv.getTickCount()
         self._freq = 1000.0 / cv.getTickFrequency()
-        self._difftimes = deque(maxlen=buffer_len)
+        # Frame intervals in milliseconds; sharing a StageTimer probe puts
+        # them next to the other stage timings
+        if timer is not None:
+            self._difftimes = timer.probe(probe, buffer_len)
+        else:
+            self._difftimes = RollingStats(buffer_len)
 
     def get(self):
         current_tick = cv.getTickCount()
         different_time = (current_tick - self._start_tick) * self._freq
         self._start_tick = current_tick
 
-        self._difftimes.append(different_time)
+        self._difftimes.add(different_time)
+
+        return self.peek()
+
+    def reset(self):
+        """Restart the interval clock, so a pause is not counted as a frame"""
+        self._start_tick = cv.getTickCount()
 
-        fps = 1000.0 / (sum(self._difftimes) / len(self._difftimes))
+    def peek(self):
+        """Rounded FPS over the window, without counting a new frame"""
+        mean = self._difftimes.mean
+        fps = 1000.0 / mean if mean else 0.0
         fps_rounded = round(fps, 2)
 
-        return fps_rounded
\ No newline at end of file
+        return fps_rounded
@@ -0,0 +1,135 @@
+import threading
+import time
+
+
+class FrameGrabber(object):
+    """Read camera frames on a dedicated thread, keeping only the newest one.
+
+    Frames are decoded into a small pool of reused buffers: one holds the
+    newest frame, one stays with the consumer until its next read(), and
+    the capture thread fills a third. A frame returned by read() is only
+    valid until the following read().
+
+    With drop=False the capture thread instead waits until the previous
+    frame was read, for replaying recordings as fast as possible without
+    skipping any; frames older than the one a read() asks for are still
+    passed over. throttle() slows capture down while nobody needs frames.
+    """
+
+    def __init__(self, cap, timer=None, drop=True):
+        self._cap = cap
+        self._timer = timer
+        self._drop = drop
+        self._cond = threading.Condition()
+        self._buffers = [None, None, None]
+        self._latest = None
+        self._held = None
+        self._captured_at = None
+        self._seq = 0
+        self._read_seq = 0
+        # Oldest sequence number the consumer still waits for
+        self._wanted_seq = 0
+        self._dropped = 0
+        self._allocations = 0
+        # Minimum seconds between reads, 0 for the source's full rate
+        self._interval = 0.0
+        self._running = False
+        self._thread = None
+
+    @property
+    def dropped(self):
+        """Number of frames replaced before any consumer picked them up"""
+        return self._dropped
+
+    @property
+    def seq(self):
+        """Sequence number of the newest frame"""
+        return self._seq
+
+    @property
+    def allocations(self):
+        """Number of times the source handed back a new array instead of filling a buffer"""
+        return self._allocations
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def throttle(self, fps):
+        """Capture at most fps frames per second; 0 restores the full rate at once"""
+        with self._cond:
+            self._interval = 1.0 / fps if fps else 0.0
+            self._cond.notify_all()
+
+    def read(self, last_seq=0, timeout=1.0):
+        """Block until a frame newer than last_seq is available.
+
+        Returns (seq, frame, captured_at) with captured_at on the
+        time.monotonic() clock; frame is None if nothing new arrived in time,
+        and seq is then that of the last frame actually read.
+        """
+        with self._cond:
+            if last_seq >= self._wanted_seq:
+                # Without dropping, the capture thread holds back until told
+                self._wanted_seq = last_seq + 1
+                self._cond.notify_all()
+            self._cond.wait_for(
+                lambda: self._seq > last_seq or not self._running, timeout)
+            if self._seq <= last_seq:
+                return self._read_seq, None, None
+            self._read_seq = self._seq
+            self._held = self._latest
+            if not self._drop:
+                self._cond.notify_all()
+            return self._seq, self._buffers[self._latest], self._captured_at
+
+    def _capture_loop(self):
+        while self._running:
+            with self._cond:
+                index = next(i for i in range(len(self._buffers))
+                             if i != self._latest and i != self._held)
+            buffer = self._buffers[index]
+
+            started = time.monotonic()
+            ret, frame = self._cap.read(buffer)
+            if not ret:
+                continue
+            now = time.monotonic()
+            # Shared-memory sources know when the daemon actually captured it
+            captured_at = getattr(self._cap, 'captured_at', None) or now
+            if self._timer is not None:
+                self._timer.record('capture', (now - started) * 1000.0)
+            if frame is not buffer:
+                self._buffers[index] = frame
+                self._allocations += 1
+
+            with self._cond:
+                if not self._drop:
+                    # Frames before the requested one need not be read
+                    self._cond.wait_for(
+                        lambda: (self._seq == self._read_seq or
+                                 self._seq < self._wanted_seq or not self._running))
+                # Single-slot buffer: a frame nobody has read yet is dropped
+                if self._seq > self._read_seq and (self._drop or
+                                                   self._seq >= self._wanted_seq):
+                    self._dropped += 1
+                self._latest = index
+                self._captured_at = captured_at
+                self._seq += 1
+                self._cond.notify_all()
+
+                if self._interval:
+                    # Woken early when throttling is lifted
+                    self._cond.wait_for(lambda: not self._interval or not self._running,
+                                        started + self._interval - time.monotonic())
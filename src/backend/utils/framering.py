@@ -0,0 +1,228 @@
+"""
+Camera frames shared between processes through a shared-memory ring
+
+A capture daemon (camera_daemon.py) decodes every frame once, straight into
+the next slot of a FrameRing; any number of local processes read the same
+slots through SharedFrameSource, which stands in for cv.VideoCapture.
+
+Layout: an int64 header (latest seq, width, height, slots, closed flag,
+fps in mHz), then per slot an int64 seqlock word and a float64
+time.monotonic() capture time, then the BGR frames. The writer sets a
+slot's word to 2 * seq - 1 while filling it and to 2 * seq when done.
+"""
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import cv2 as cv
+import numpy as np
+
+_HEADER_FIELDS = 8
+_SEQ, _WIDTH, _HEIGHT, _SLOTS, _CLOSED, _FPS = range(6)
+
+# Guards the temporary resource tracker patch in _attach
+_attach_lock = threading.Lock()
+
+
+def _attach(name):
+    """Open an existing block without letting this process unlink it on exit"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 every attached block is registered with the
+        # resource tracker, which would destroy the owner's block when the
+        # first reader exits. Unregistering afterwards is no cure: spawned
+        # children share their parent's tracker and would drop its entry
+        with _attach_lock:
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+            try:
+                return shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+
+
+class FrameRing(object):
+    """Shared-memory ring of BGR frames; one writer, any number of readers"""
+
+    def __init__(self, name, width=None, height=None, slots=4, create=False):
+        if create:
+            size = self._size(width, height, slots)
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self._shm = _attach(name)
+        self._header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=self._shm.buf)
+        if create:
+            self._header[:] = 0
+            self._header[_WIDTH] = width
+            self._header[_HEIGHT] = height
+            self._header[_SLOTS] = slots
+
+        self.width = int(self._header[_WIDTH])
+        self.height = int(self._header[_HEIGHT])
+        self.slots = int(self._header[_SLOTS])
+        offset = 8 * _HEADER_FIELDS
+        self._slot_seq = np.ndarray((self.slots,), dtype=np.int64,
+                                    buffer=self._shm.buf, offset=offset)
+        self._slot_time = np.ndarray((self.slots,), dtype=np.float64,
+                                     buffer=self._shm.buf, offset=offset + 8 * self.slots)
+        self._frames = np.ndarray((self.slots, self.height, self.width, 3), dtype=np.uint8,
+                                  buffer=self._shm.buf, offset=offset + 16 * self.slots)
+        if create:
+            self._slot_seq[:] = 0
+
+    @staticmethod
+    def _size(width, height, slots):
+        return 8 * _HEADER_FIELDS + 16 * slots + slots * height * width * 3
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def seq(self):
+        """Sequence number of the newest complete frame, 0 before the first"""
+        return int(self._header[_SEQ])
+
+    @property
+    def closed(self):
+        return bool(self._header[_CLOSED])
+
+    @property
+    def fps(self):
+        return self._header[_FPS] / 1000.0
+
+    def publish(self, cap):
+        """Decode the next frame from cap directly into the ring; False on failure"""
+        seq = self.seq + 1
+        i = seq % self.slots
+        self._slot_seq[i] = 2 * seq - 1
+        ret, frame = cap.read(self._frames[i])
+        if not ret:
+            self._slot_seq[i] = 0
+            return False
+        if frame is not None and frame.shape != self._frames[i].shape:
+            raise ValueError(f"Camera delivered {frame.shape[1]}x{frame.shape[0]}, "
+                             f"ring holds {self.width}x{self.height}")
+        if frame is not None and frame.ctypes.data != self._frames[i].ctypes.data:
+            self._frames[i] = frame
+        self._slot_time[i] = time.monotonic()
+        self._slot_seq[i] = 2 * seq
+        self._header[_SEQ] = seq
+        return True
+
+    def set_fps(self, fps):
+        self._header[_FPS] = int(fps * 1000)
+
+    def mark_closed(self):
+        self._header[_CLOSED] = 1
+
+    def view(self, seq):
+        """Zero-copy (frame, captured_at) of frame seq, or (None, None) once the
+        writer has reused its slot. The frame stays valid for about
+        slots - 1 further frames; check with valid(seq) after using it."""
+        i = seq % self.slots
+        if self._slot_seq[i] != 2 * seq:
+            return None, None
+        return self._frames[i], float(self._slot_time[i])
+
+    def valid(self, seq):
+        return self._slot_seq[seq % self.slots] == 2 * seq
+
+    def copy(self, seq, out):
+        """Copy frame seq into out; returns captured_at, or None if it was overwritten"""
+        frame, captured_at = self.view(seq)
+        if frame is None:
+            return None
+        np.copyto(out, frame)
+        # The writer may have started on the slot while we copied
+        return captured_at if self.valid(seq) else None
+
+    def close(self):
+        # Drop the numpy views first, SharedMemory refuses to close otherwise
+        self._header = None
+        self._slot_seq = None
+        self._slot_time = None
+        self._frames = None
+        self._shm.close()
+
+    def unlink(self):
+        self._shm.unlink()
+
+
+class SharedFrameSource(object):
+    """Reads the newest frames of a FrameRing like cv.VideoCapture.
+
+    read(image) copies into image, which is what FrameGrabber's reused
+    buffers ask for; read() without an image returns a read-only view into
+    shared memory with no copy at all, valid for the next few frames, unless
+    copy is set. captured_at is the daemon's time.monotonic() capture time
+    of the last frame read.
+    """
+
+    def __init__(self, name, timeout=0.5, poll_interval=0.001, copy=False):
+        self._name = name
+        self._copy = copy
+        self._timeout = timeout
+        self._poll_interval = poll_interval
+        try:
+            self._ring = FrameRing(name)
+        except FileNotFoundError:
+            self._ring = None
+        self._last_seq = 0
+        self.captured_at = None
+
+    def read(self, image=None):
+        ring = self._ring
+        if ring is None:
+            return False, None
+        deadline = time.monotonic() + self._timeout
+        while True:
+            seq = ring.seq
+            if seq > self._last_seq:
+                if (image is None or not image.flags.writeable
+                        or image.shape != (ring.height, ring.width, 3)):
+                    frame, captured_at = ring.view(seq)
+                    if frame is not None:
+                        if image is not None or self._copy:
+                            frame = frame.copy()
+                        else:
+                            frame = frame.view()
+                            frame.flags.writeable = False
+                        if not ring.valid(seq):
+                            captured_at = None
+                else:
+                    frame = image
+                    captured_at = ring.copy(seq, image)
+                if captured_at is not None:
+                    self._last_seq = seq
+                    self.captured_at = captured_at
+                    return True, frame
+                # Lapped by the writer; take the frame that replaced it
+                continue
+            if ring.closed or time.monotonic() > deadline:
+                return False, None
+            time.sleep(self._poll_interval)
+
+    def isOpened(self):
+        return self._ring is not None and not self._ring.closed
+
+    def get(self, prop):
+        if self._ring is None:
+            return 0.0
+        if prop == cv.CAP_PROP_FRAME_WIDTH:
+            return float(self._ring.width)
+        if prop == cv.CAP_PROP_FRAME_HEIGHT:
+            return float(self._ring.height)
+        if prop == cv.CAP_PROP_FPS:
+            return self._ring.fps
+        return 0.0
+
+    def set(self, prop, value):
+        # The capture daemon owns the camera settings
+        return False
+
+    def release(self):
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
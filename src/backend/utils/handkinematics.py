@@ -0,0 +1,152 @@
+import numpy as np
+
+
+class _HandHistory(object):
+    """Ring buffer of recent (time, x, y) samples for one hand"""
+
+    def __init__(self, size):
+        self.size = size
+        # Every sample is written twice, so the newest samples are always one
+        # contiguous slice ending at next + size and no copy is needed
+        self.t = np.zeros(2 * size)
+        self.xy = np.zeros((2 * size, 2))
+        self.next = 0
+        self.count = 0
+
+        # Movement phase, for onset and swipe detection
+        self.moving = False
+        self.origin = None
+        self.path = 0.0
+        self.swiped = False
+
+    def push(self, timestamp, x, y):
+        i = self.next
+        self.t[i] = self.t[i + self.size] = timestamp
+        self.xy[i] = self.xy[i + self.size] = (x, y)
+        self.next = (i + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def window(self):
+        end = self.next + self.size
+        return self.t[end - self.count:end], self.xy[end - self.count:end]
+
+
+class HandKinematics(object):
+    """Velocity, acceleration, speed statistics and gesture events per hand.
+
+    update() takes measured positions in canvas pixels with their time in
+    seconds. Velocity and acceleration come from a quadratic least-squares
+    fit over the newest fit_samples samples, speed percentiles from the
+    whole history. A hitOnset event fires when a hand's speed rises past
+    onset_speed; a swipe fires once per movement when the hand has since
+    travelled swipe_distance in a nearly straight line.
+    """
+
+    def __init__(self, history=64, fit_samples=6, onset_speed=1200.0,
+                 release_ratio=0.5, swipe_distance=250.0, straightness=0.8):
+        self.history = history
+        self.fit_samples = fit_samples
+        self.onset_speed = onset_speed
+        self.release_ratio = release_ratio
+        self.swipe_distance = swipe_distance
+        self.straightness = straightness
+        self._histories = {}
+
+    def update(self, timestamp, positions):
+        """Add one measurement; returns ({hand: features}, [events])"""
+        features = {}
+        events = []
+        for hand, pos in positions.items():
+            if not pos['visible']:
+                # Tracking lost; velocities across the gap would be meaningless
+                self._histories.pop(hand, None)
+                continue
+
+            history = self._histories.get(hand)
+            if history is None:
+                history = self._histories[hand] = _HandHistory(self.history)
+            history.push(timestamp, pos['x'], pos['y'])
+            t, xy = history.window()
+            if len(t) < 3:
+                continue
+
+            # Fit x(t), y(t) = c0 + c1 t + c2 t^2 with t = 0 at the newest
+            # sample, so c1 is the current velocity and 2 c2 the acceleration
+            fit_t = t[-self.fit_samples:] - t[-1]
+            design = np.stack([np.ones_like(fit_t), fit_t, fit_t * fit_t], axis=1)
+            coefficients = np.linalg.lstsq(design, xy[-self.fit_samples:], rcond=None)[0]
+            velocity = coefficients[1]
+            acceleration = 2.0 * coefficients[2]
+
+            dt = np.diff(t)
+            steps = np.hypot(*np.diff(xy, axis=0).T)
+            valid = dt > 0
+            speeds = steps[valid] / dt[valid]
+            if not len(speeds):
+                continue
+            p50, p90 = np.percentile(speeds, (50, 90)).tolist()
+            speed = float(np.hypot(*velocity))
+
+            features[hand] = {
+                'velocity': velocity.tolist(),
+                'acceleration': acceleration.tolist(),
+                'speed': speed,
+                'speedP50': p50,
+                'speedP90': p90
+            }
+            events += self._detect_events(hand, history, speed, xy, steps)
+        return features, events
+
+    def _detect_events(self, hand, history, speed, xy, steps):
+        if not history.moving:
+            if speed < self.onset_speed:
+                return []
+            # The fit window already covers the start of the movement
+            start = min(self.fit_samples, len(xy))
+            history.moving = True
+            history.origin = xy[-start].copy()
+            history.path = float(steps[-(start - 1):].sum())
+            history.swiped = False
+            return [{'type': 'hitOnset', 'hand': hand, 'speed': speed}]
+
+        if speed < self.release_ratio * self.onset_speed:
+            history.moving = False
+            return []
+
+        history.path += float(steps[-1])
+        dx, dy = (xy[-1] - history.origin).tolist()
+        distance = float(np.hypot(dx, dy))
+        if (history.swiped or distance < self.swipe_distance or
+                distance < self.straightness * history.path):
+            return []
+        history.swiped = True
+        if abs(dx) >= abs(dy):
+            direction = 'right' if dx > 0 else 'left'
+        else:
+            direction = 'down' if dy > 0 else 'up'
+        return [{'type': 'swipe', 'hand': hand, 'direction': direction,
+                 'distance': distance, 'speed': speed}]
+
+
+def scale_kinematics(features, events, sx, sy):
+    """Rescale features and events to a canvas sx, sy times the size.
+
+    Vectors scale per axis; speeds and distances with the canvas width.
+    """
+    scale = np.array([sx, sy])
+    scaled = {}
+    for hand, values in features.items():
+        scaled[hand] = {
+            'velocity': (np.array(values['velocity']) * scale).tolist(),
+            'acceleration': (np.array(values['acceleration']) * scale).tolist(),
+            'speed': values['speed'] * sx,
+            'speedP50': values['speedP50'] * sx,
+            'speedP90': values['speedP90'] * sx
+        }
+    scaled_events = []
+    for event in events:
+        event = dict(event, speed=event['speed'] * sx)
+        if 'distance' in event:
+            event['distance'] *= sx
+        scaled_events.append(event)
+    return scaled, scaled_events
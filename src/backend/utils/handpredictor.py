@@ -0,0 +1,91 @@
+class _AxisFilter(object):
+    """Constant-velocity Kalman filter along one axis"""
+
+    def __init__(self, position, measurement_noise):
+        self.p = position
+        self.v = 0.0
+        # Covariance [[p00, p01], [p01, p11]]; velocity starts unknown
+        self.p00 = measurement_noise
+        self.p01 = 0.0
+        self.p11 = 1e6
+
+    def update(self, z, dt, process_noise, measurement_noise):
+        # Predict
+        if dt > 0:
+            q = process_noise
+            self.p += self.v * dt
+            self.p00 += dt * (2 * self.p01 + dt * self.p11) + q * dt ** 3 / 3
+            self.p01 += dt * self.p11 + q * dt ** 2 / 2
+            self.p11 += q * dt
+
+        # Correct
+        s = self.p00 + measurement_noise
+        k0 = self.p00 / s
+        k1 = self.p01 / s
+        residual = z - self.p
+        self.p += k0 * residual
+        self.v += k1 * residual
+        self.p11 -= k1 * self.p01
+        self.p01 -= k0 * self.p01
+        self.p00 -= k0 * self.p00
+
+
+class HandPredictor(object):
+    """Smooths measured hand positions and extrapolates them between measurements.
+
+    One constant-velocity Kalman filter per hand and axis. update() feeds a
+    measurement and returns the filtered positions; predict() extrapolates
+    the last estimate to a later time without touching the filter state.
+    Times are in seconds, positions in canvas pixels.
+    """
+
+    def __init__(self, process_noise=2e6, measurement_noise=9.0,
+                 max_prediction=0.1):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.max_prediction = max_prediction
+        self._filters = {}
+        self.last_update = None
+
+    def update(self, timestamp, positions):
+        filtered = {}
+        for hand, pos in positions.items():
+            if not pos['visible']:
+                # Tracking lost; start from scratch when the hand comes back
+                self._filters.pop(hand, None)
+                filtered[hand] = dict(pos)
+                continue
+
+            state = self._filters.get(hand)
+            if state is None:
+                state = self._filters[hand] = (
+                    timestamp,
+                    _AxisFilter(pos['x'], self.measurement_noise),
+                    _AxisFilter(pos['y'], self.measurement_noise))
+            else:
+                dt = timestamp - state[0]
+                for axis, z in ((state[1], pos['x']), (state[2], pos['y'])):
+                    axis.update(z, dt, self.process_noise, self.measurement_noise)
+                self._filters[hand] = state = (timestamp, state[1], state[2])
+
+            filtered[hand] = {'x': state[1].p, 'y': state[2].p, 'visible': True}
+
+        self.last_update = timestamp
+        return filtered
+
+    def predict(self, timestamp, width, height):
+        """Extrapolate to timestamp, or return None once the last measurement is too old"""
+        if self.last_update is None or timestamp - self.last_update > self.max_prediction:
+            return None
+
+        predicted = {}
+        for hand, state in self._filters.items():
+            dt = timestamp - state[0]
+            x = state[1].p + state[1].v * dt
+            y = state[2].p + state[2].v * dt
+            predicted[hand] = {
+                'x': max(0, min(width, x)),
+                'y': max(0, min(height, y)),
+                'visible': True
+            }
+        return predicted
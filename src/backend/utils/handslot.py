@@ -0,0 +1,96 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .framering import _attach
+
+
+class HandPositionSlot(object):
+    """Hand positions shared between processes through a seqlock-guarded block.
+
+    One process writes, any number read. The writer bumps the sequence to
+    an odd value before updating and to an even value afterwards, so a
+    reader that sees the same even sequence before and after copying knows
+    it got a consistent snapshot.
+    """
+
+    HANDS = ('leftHand', 'rightHand')
+    LANDMARKS = 33
+    # seq, landmark flag, capture time, hands as (x, y, visible), landmarks
+    # as (x, y, z, visibility)
+    _TIME_OFFSET = 16
+    _HANDS_OFFSET = 24
+    _LANDMARKS_OFFSET = _HANDS_OFFSET + 8 * 3 * len(HANDS)
+    SIZE = _LANDMARKS_OFFSET + 4 * 4 * LANDMARKS
+
+    def __init__(self, name=None, create=False):
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True,
+                                                   size=self.SIZE)
+        else:
+            # The creating process alone owns and unlinks the block
+            self._shm = _attach(name)
+        self._header = np.ndarray((2,), dtype=np.int64, buffer=self._shm.buf)
+        self._seq = self._header[:1]
+        self._captured_at = np.ndarray((1,), dtype=np.float64,
+                                       buffer=self._shm.buf, offset=self._TIME_OFFSET)
+        self._values = np.ndarray((len(self.HANDS), 3), dtype=np.float64,
+                                  buffer=self._shm.buf, offset=self._HANDS_OFFSET)
+        self._landmarks = np.ndarray((self.LANDMARKS, 4), dtype=np.float32,
+                                     buffer=self._shm.buf,
+                                     offset=self._LANDMARKS_OFFSET)
+        if create:
+            self._header[:] = 0
+            self._captured_at[:] = np.nan
+            self._values[:] = 0.0
+            self._landmarks[:] = 0.0
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def write(self, positions, landmarks=None, captured_at=None):
+        self._seq[0] += 1
+        self._captured_at[0] = np.nan if captured_at is None else captured_at
+        for i, hand in enumerate(self.HANDS):
+            pos = positions[hand]
+            self._values[i] = (pos['x'], pos['y'], 1.0 if pos['visible'] else 0.0)
+        if landmarks is not None:
+            self._landmarks[:] = landmarks
+        self._header[1] = landmarks is not None
+        self._seq[0] += 1
+
+    def read(self):
+        """Return (seq, positions, landmarks, captured_at); positions is None if
+        nothing was written yet, landmarks and captured_at are None if the
+        writer had none."""
+        while True:
+            before = int(self._seq[0])
+            captured_at = float(self._captured_at[0])
+            values = self._values.copy()
+            has_landmarks = bool(self._header[1])
+            landmarks = self._landmarks.copy() if has_landmarks else None
+            if before % 2 == 0 and before == int(self._seq[0]):
+                break
+
+        if before == 0:
+            return 0, None, None, None
+        positions = {}
+        for i, hand in enumerate(self.HANDS):
+            x, y, visible = values[i].tolist()
+            positions[hand] = {'x': x, 'y': y, 'visible': visible > 0.5}
+        if captured_at != captured_at:
+            captured_at = None
+        return before // 2, positions, landmarks, captured_at
+
+    def close(self):
+        # Drop the numpy views first, SharedMemory refuses to close otherwise
+        self._header = None
+        self._seq = None
+        self._captured_at = None
+        self._values = None
+        self._landmarks = None
+        self._shm.close()
+
+    def unlink(self):
+        self._shm.unlink()
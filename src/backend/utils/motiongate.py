@@ -0,0 +1,69 @@
+import cv2 as cv
+import numpy as np
+
+
+class MotionGate(object):
+    """Decides per frame whether pose inference is worth running.
+
+    Each frame is shrunk to a tiny grayscale thumbnail and compared with
+    the thumbnail of the last frame that went through inference; only if
+    enough pixels changed is it inferred again. While nobody is in view,
+    inference runs at most presence_check_hz, and no frame goes without
+    inference for longer than max_skip_s, so lighting drift and people
+    standing perfectly still are still picked up.
+    """
+
+    def __init__(self, width=64, pixel_threshold=12, min_fraction=0.002,
+                 presence_check_hz=4.0, max_skip_s=1.0):
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_fraction = min_fraction
+        self.presence_interval = 1.0 / presence_check_hz if presence_check_hz else 0.0
+        self.max_skip_s = max_skip_s
+
+        self._small = None
+        self._gray = None
+        self._reference = None
+        self._diff = None
+        self._last_inference = None
+
+        self.inferred = 0
+        self.skipped = 0
+
+    def check(self, image, now, present=True):
+        """True if image (BGR) should go through inference; it then becomes
+        the reference the following frames are compared with"""
+        height, width = image.shape[:2]
+        size = (self.width, max(1, round(height * self.width / width)))
+        if self._small is None or self._small.shape[1::-1] != size:
+            self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            self._gray = np.empty((size[1], size[0]), dtype=np.uint8)
+            self._diff = np.empty_like(self._gray)
+            self._reference = None
+        # Shrinking first makes the colour conversion nearly free
+        cv.resize(image, size, dst=self._small, interpolation=cv.INTER_AREA)
+        cv.cvtColor(self._small, cv.COLOR_BGR2GRAY, dst=self._gray)
+
+        if self._reference is None or self._last_inference is None:
+            infer = True
+        else:
+            elapsed = now - self._last_inference
+            if elapsed >= self.max_skip_s:
+                infer = True
+            elif not present and elapsed < self.presence_interval:
+                infer = False
+            else:
+                cv.absdiff(self._gray, self._reference, dst=self._diff)
+                changed = np.count_nonzero(self._diff > self.pixel_threshold)
+                infer = changed >= self.min_fraction * self._diff.size
+
+        if infer:
+            # Keep this thumbnail as the reference, convert into the old one next
+            if self._reference is None:
+                self._reference = np.empty_like(self._gray)
+            self._gray, self._reference = self._reference, self._gray
+            self._last_inference = now
+            self.inferred += 1
+        else:
+            self.skipped += 1
+        return infer
@@ -0,0 +1,112 @@
+import cv2 as cv
+import numpy as np
+
+# mp.solutions.pose.POSE_CONNECTIONS, for the landmark overlay
+POSE_CONNECTIONS = np.array([
+    (0, 1), (0, 4), (1, 2), (2, 3), (3, 7), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (11, 23), (12, 14), (12, 24), (13, 15), (14, 16),
+    (15, 17), (15, 19), (15, 21), (16, 18), (16, 20), (16, 22), (17, 19),
+    (18, 20), (23, 24), (23, 25), (24, 26), (25, 27), (26, 28), (27, 29),
+    (27, 31), (28, 30), (28, 32), (29, 31), (30, 32),
+])
+
+# Arms and legs as shoulder/hip -> elbow/knee -> wrist/ankle chains, each
+# drawn as two sticks that taper from radius level 0 to 1 and 1 to 2
+LIMBS = np.array([(11, 13, 15), (12, 14, 16), (23, 25, 27), (24, 26, 28)])
+STICK_START = LIMBS[:, :2].ravel()
+STICK_END = LIMBS[:, 1:].ravel()
+STICK_START_LEVEL = np.tile([0, 1], len(LIMBS))
+STICK_END_LEVEL = np.tile([1, 2], len(LIMBS))
+
+# The head circle encloses the eyes and mouth; both legs hang from mid-hip
+FACE = np.array([1, 4, 7, 8, 9, 10])
+HIPS = np.array([23, 24])
+
+
+def landmarks_to_array(landmarks):
+    """(33, 4) float32 array of x, y, z, visibility from a MediaPipe landmark list"""
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks.landmark],
+                    dtype=np.float32)
+
+
+class PictogramRenderer(object):
+    """Draws Tokyo 2020 style pictograms from pose landmark arrays.
+
+    The limb topology is fixed, so every stick of a frame is computed in one
+    numpy pass and the background is copied from a prebuilt buffer instead
+    of being filled again. render() returns an internal canvas that stays
+    valid until the next call.
+    """
+
+    def __init__(self, width, height, color=(100, 33, 3),
+                 bg_color=(255, 255, 255), visibility_th=0.5):
+        self.width = width
+        self.height = height
+        self.color = color
+        self.visibility_th = visibility_th
+        self._background = np.empty((height, width, 3), dtype=np.uint8)
+        self._background[:] = bg_color
+        self._canvas = self._background.copy()
+        self._scale = np.array([width, height], dtype=np.float32)
+        self._limit = np.array([width - 1, height - 1], dtype=np.float32)
+
+    def to_pixels(self, landmarks):
+        """Normalized landmark coordinates to (33, 2) int32 pixel positions"""
+        points = np.clip(landmarks[:, :2] * self._scale, 0, self._limit)
+        return points.astype(np.int32)
+
+    def render(self, landmarks):
+        """Pictogram for a (33, 4) array of normalized x, y, z, visibility, or
+        the empty background for None"""
+        canvas = self._canvas
+        np.copyto(canvas, self._background)
+        if landmarks is None:
+            return canvas
+
+        points = self.to_pixels(landmarks)
+        visible = landmarks[:, 3] > self.visibility_th
+        points[HIPS] = points[HIPS].mean(axis=0).astype(np.int32)
+
+        (face_x, face_y), face_radius = cv.minEnclosingCircle(points[FACE])
+        face_radius = int(face_radius * 1.5)
+        radius01 = int(face_radius * (4 / 5))
+        radius02 = int(radius01 * (3 / 4))
+        radius03 = int(radius02 * (3 / 4))
+        radii = np.array([radius01, radius02, radius03])
+        cv.circle(canvas, (int(face_x), int(face_y)), face_radius, self.color, -1)
+
+        drawn = visible[STICK_START] & visible[STICK_END]
+        if not drawn.any():
+            return canvas
+        start = points[STICK_START[drawn]].astype(np.float64)
+        end = points[STICK_END[drawn]].astype(np.float64)
+        start_radius = radii[STICK_START_LEVEL[drawn]][:, None]
+        end_radius = radii[STICK_END_LEVEL[drawn]][:, None]
+
+        # Each stick is a quad between the sides of its two end circles
+        direction = end - start
+        angle = np.arctan2(direction[:, 1], direction[:, 0]) + np.pi / 2
+        normal = np.stack([np.cos(angle), np.sin(angle)], axis=1)
+        quads = np.stack([start + normal * start_radius, end + normal * end_radius,
+                          end - normal * end_radius, start - normal * start_radius],
+                         axis=1).astype(np.int32)
+
+        # fillPoly would leave overlaps unfilled, so quads go one at a time
+        for quad in quads:
+            cv.fillConvexPoly(canvas, quad, self.color)
+        joints = np.concatenate([
+            np.concatenate([start, start_radius], axis=1),
+            np.concatenate([end, end_radius], axis=1)]).astype(np.int32)
+        for x, y, radius in np.unique(joints, axis=0).tolist():
+            cv.circle(canvas, (x, y), radius, self.color, -1)
+        return canvas
+
+    def draw_landmarks(self, image, landmarks, color=(0, 255, 0)):
+        """Overlay visible landmarks and their connections on image in place"""
+        points = self.to_pixels(landmarks)
+        visible = landmarks[:, 3] > self.visibility_th
+        connections = POSE_CONNECTIONS[visible[POSE_CONNECTIONS].all(axis=1)]
+        cv.polylines(image, points[connections], False, color, 2)
+        for x, y in points[visible].tolist():
+            cv.circle(image, (x, y), 5, color, 2)
+        return image
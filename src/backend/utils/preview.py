@@ -0,0 +1,134 @@
+import threading
+import time
+
+import cv2 as cv
+import numpy as np
+
+from .pictogram import PictogramRenderer
+
+
+class PreviewEncoder(object):
+    """Downscaled JPEG preview of camera frames with a landmark overlay.
+
+    The pose loop checks wanted() and only then hands over a frame with
+    submit(), which copies it into a spare buffer; resizing, drawing and
+    JPEG encoding happen on a worker thread. Without subscribers wanted()
+    is False and the worker sleeps, so an unused preview costs nothing.
+    """
+
+    def __init__(self, rate_hz=5.0, width=320, quality=70, canvas=(1024, 768),
+                 timer=None):
+        self.interval = 1.0 / rate_hz
+        self.width = width
+        self.quality = quality
+        self.timer = timer
+        # Landmarks arrive in canvas pixels; the overlay needs normalized ones
+        self._canvas = np.array(canvas, dtype=np.float32)
+
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._subscribers = 0
+        self._next_due = 0.0
+
+        # The pose thread fills the back buffer, the worker encodes the front one
+        self._back = None
+        self._front = None
+        self._landmarks = None
+        self._pending = False
+
+        self.seq = 0
+        self.jpeg = None
+        self.running = False
+        self._thread = None
+
+    @property
+    def subscribers(self):
+        return self._subscribers
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self.running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def subscribe(self):
+        with self._condition:
+            self._subscribers += 1
+
+    def unsubscribe(self):
+        with self._condition:
+            self._subscribers -= 1
+            if not self._subscribers:
+                # Free the frame buffers while nobody watches
+                self._back = self._front = None
+                self._pending = False
+
+    def wanted(self, now):
+        """Whether the pose loop should submit a frame now"""
+        if not self._subscribers or now < self._next_due:
+            return False
+        self._next_due = max(self._next_due, now - self.interval) + self.interval
+        return True
+
+    def submit(self, frame, landmarks=None):
+        """Copy a frame for encoding; landmarks is a canvas-pixel (33, 4) array"""
+        with self._condition:
+            if self._back is None or self._back.shape != frame.shape:
+                self._back = np.empty_like(frame)
+            np.copyto(self._back, frame)
+            self._landmarks = landmarks
+            self._pending = True
+            self._condition.notify_all()
+
+    def wait(self, last_seq, timeout=None):
+        """Block until a frame newer than last_seq is encoded; returns (seq, jpeg)"""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.seq != last_seq or not self.running, timeout)
+            return self.seq, self.jpeg
+
+    def _encode_loop(self):
+        renderer = None
+        resized = None
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or not self.running)
+                if not self.running:
+                    return
+                self._back, self._front = self._front, self._back
+                frame = self._front
+                landmarks = self._landmarks
+                self._pending = False
+            if frame is None:
+                continue
+
+            started = time.monotonic()
+            height, width = frame.shape[:2]
+            size = (self.width, max(1, round(height * self.width / width)))
+            if resized is None or resized.shape[1::-1] != size:
+                resized = np.empty((size[1], size[0], 3), dtype=np.uint8)
+                renderer = PictogramRenderer(*size)
+            cv.resize(frame, size, dst=resized, interpolation=cv.INTER_AREA)
+
+            if landmarks is not None:
+                normalized = landmarks.copy()
+                normalized[:, :2] /= self._canvas
+                renderer.draw_landmarks(resized, normalized)
+
+            ok, encoded = cv.imencode('.jpg', resized,
+                                      [cv.IMWRITE_JPEG_QUALITY, self.quality])
+            if self.timer is not None:
+                self.timer.record('preview_encode', (time.monotonic() - started) * 1000.0)
+            if not ok:
+                continue
+            with self._condition:
+                self.seq += 1
+                self.jpeg = encoded.tobytes()
+                self._condition.notify_all()
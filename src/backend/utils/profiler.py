@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+
+class SamplingProfiler(object):
+    """Samples the Python stacks of a few threads at a fixed interval.
+
+    A background thread reads sys._current_frames() every `interval`
+    seconds, so the profiled threads run unmodified; time spent inside C
+    extensions such as pose.process is charged to the Python frame that
+    called it. threads maps a display name to a thread ident. Stacks are
+    aggregated per function and can be written as collapsed stacks
+    (flamegraph.pl, speedscope, inferno) or as speedscope JSON.
+    """
+
+    def __init__(self, threads, interval=0.005):
+        self.threads = dict(threads)
+        self.interval = interval
+        # (thread name, stack of frame labels, outermost first) -> samples
+        self.counts = {}
+        self.samples = 0
+        self.started_at = None
+        self.stopped_at = None
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.stopped_at = time.monotonic()
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            # ';' separates frames in the collapsed format
+            label = self._labels[code] = (
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                f"{code.co_firstlineno})").replace(';', ':')
+        return label
+
+    def _sample_loop(self):
+        next_sample = time.monotonic()
+        while not self._stop.is_set():
+            frames = sys._current_frames()
+            for name, ident in self.threads.items():
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    key = (name, tuple(reversed(stack)))
+                    self.counts[key] = self.counts.get(key, 0) + 1
+            self.samples += 1
+            del frames
+
+            # Skip samples rather than bunching them up after a stall
+            next_sample = max(next_sample + self.interval, time.monotonic())
+            self._stop.wait(next_sample - time.monotonic())
+
+    def write_collapsed(self, path):
+        """One 'thread;outer;...;inner count' line per distinct stack"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for (name, stack), count in sorted(self.counts.items()):
+                f.write(f"{name};{';'.join(stack)} {count}\n")
+
+    def write_speedscope(self, path):
+        """Speedscope file with one sampled profile per thread, in seconds"""
+        frames = []
+        frame_index = {}
+        profiles = {}
+        for (name, stack), count in sorted(self.counts.items()):
+            indices = []
+            for label in stack:
+                index = frame_index.get(label)
+                if index is None:
+                    index = frame_index[label] = len(frames)
+                    frames.append({'name': label})
+                indices.append(index)
+            profile = profiles.setdefault(name, {'samples': [], 'weights': []})
+            profile['samples'].append(indices)
+            profile['weights'].append(count * self.interval)
+
+        duration = (self.stopped_at or time.monotonic()) - self.started_at
+        document = {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': frames},
+            'profiles': [
+                {
+                    'type': 'sampled',
+                    'name': name,
+                    'unit': 'seconds',
+                    'startValue': 0,
+                    'endValue': duration,
+                    'samples': profile['samples'],
+                    'weights': profile['weights']
+                }
+                for name, profile in profiles.items()
+            ],
+            'name': 'pose server profile',
+            'exporter': 'SamplingProfiler'
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(document, f)
+
+    def write(self, path, format='collapsed'):
+        if format == 'speedscope':
+            self.write_speedscope(path)
+        else:
+            self.write_collapsed(path)
+
+
+class SlowCallbackLog(logging.Handler):
+    """Collects and prints the slow-callback warnings of asyncio debug mode"""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages = []
+
+    def emit(self, record):
+        message = record.getMessage()
+        if message.startswith('Executing'):
+            self.messages.append(message)
+            print(f"Slow callback: {message}")
@@ -0,0 +1,123 @@
+import math
+from collections import deque
+
+import numpy as np
+
+# Latency histogram: bucket 0 holds values below MIN_VALUE, bucket i >= 1
+# covers [MIN_VALUE * 2 ** ((i - 1) / 8), MIN_VALUE * 2 ** (i / 8)), so each
+# bucket is about 9% wide. 28 octaves reach past 100 s in milliseconds.
+MIN_VALUE = 1e-3
+BUCKETS_PER_OCTAVE = 8
+NUM_BUCKETS = 28 * BUCKETS_PER_OCTAVE + 1
+
+# Representative value of each bucket: its geometric midpoint
+_BUCKET_VALUES = MIN_VALUE * 2.0 ** ((np.arange(NUM_BUCKETS) - 0.5) / BUCKETS_PER_OCTAVE)
+_BUCKET_VALUES[0] = 0.0
+
+
+def _bucket(value):
+    if value < MIN_VALUE:
+        return 0
+    return min(int(math.log2(value / MIN_VALUE) * BUCKETS_PER_OCTAVE) + 1,
+               NUM_BUCKETS - 1)
+
+
+class RollingStats(object):
+    """Mean, percentiles and max over the last `window` values.
+
+    add() is O(1): a running sum gives the mean, a fixed-bucket histogram
+    the percentiles (to within half a bucket, about 4.5%) and a monotonic
+    queue the exact maximum. One thread adds values; any thread may read
+    without a lock. The window maximum is published through a single
+    attribute at the end of add(), so readers never see the queue while it
+    is being updated; under concurrent adds a snapshot may mix values from
+    neighbouring adds, which is fine for telemetry.
+    """
+
+    def __init__(self, window=600):
+        self.window = window
+        self.count = 0
+        self._values = [0.0] * window
+        self._buckets = [0] * window
+        self._histogram = [0] * NUM_BUCKETS
+        self._sum = 0.0
+        self._index = 0
+        # (sequence, value) pairs with decreasing values; the head is the max.
+        # Only add() touches the queue, readers use _max
+        self._maxima = deque()
+        self._max = None
+
+    def add(self, value):
+        i = self._index
+        bucket = _bucket(value)
+        if self.count >= self.window:
+            self._sum -= self._values[i]
+            self._histogram[self._buckets[i]] -= 1
+        self._values[i] = value
+        self._buckets[i] = bucket
+        self._histogram[bucket] += 1
+        self._sum += value
+
+        maxima = self._maxima
+        while maxima and maxima[-1][1] <= value:
+            maxima.pop()
+        maxima.append((self.count, value))
+        if maxima[0][0] <= self.count - self.window:
+            maxima.popleft()
+        self._max = maxima[0][1]
+
+        self.count += 1
+        self._index = i + 1
+        if self._index == self.window:
+            self._index = 0
+            # Re-add from scratch once per lap so rounding errors cannot pile up
+            self._sum = math.fsum(self._values)
+
+    @property
+    def size(self):
+        """Number of values currently in the window"""
+        return min(self.count, self.window)
+
+    @property
+    def mean(self):
+        size = self.size
+        return self._sum / size if size else None
+
+    @property
+    def max(self):
+        return self._max
+
+    def percentiles(self, qs):
+        """Nearest-rank percentiles for each q in qs (0-100), None when empty"""
+        maximum = self._max
+        histogram = np.array(self._histogram)
+        cumulative = np.cumsum(histogram)
+        total = int(cumulative[-1])
+        if not total or maximum is None:
+            return [None] * len(qs)
+        ranks = np.maximum(1, np.ceil(np.asarray(qs, dtype=np.float64) / 100.0 * total))
+        buckets = np.searchsorted(cumulative, ranks)
+        # A bucket midpoint can overshoot the largest value actually seen
+        return np.minimum(_BUCKET_VALUES[buckets], maximum).tolist()
+
+    def snapshot(self):
+        """{count, mean, p50, p95, p99, max} over the window, or None when empty"""
+        # One read of each shared field, so a concurrent add() cannot make
+        # them disappear halfway through
+        count = self.count
+        total = self._sum
+        maximum = self._max
+        size = min(count, self.window)
+        if not size or maximum is None:
+            return None
+        p50, p95, p99 = self.percentiles((50, 95, 99))
+        if p50 is None:
+            return None
+        return {
+            'count': count,
+            'mean': round(total / size, 3),
+            'p50': round(min(p50, maximum), 3),
+            'p95': round(min(p95, maximum), 3),
+            'p99': round(min(p99, maximum), 3),
+            'max': round(maximum, 3)
+        }
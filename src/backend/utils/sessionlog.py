@@ -0,0 +1,222 @@
+"""
+Memory-mapped, columnar log of pose results for long sessions
+
+A session is a directory with one fixed-record file per column:
+
+    time.f8          float64            time.monotonic() of the camera frame
+    seq.u8           uint64             pose result sequence number
+    landmarks.f4     float32 (N, 33, 3) x, y, z in canvas pixels
+    visibility.f4    float32 (N, 33)
+    meta.json        record count, landmark count, canvas size, clock reference
+
+Columns are preallocated in chunks and written through np.memmap by a
+background thread; SessionReader maps them read-only and slices by time
+with a binary search on the (monotonic) time column.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+_COLUMNS = {
+    'time': ('time.f8', np.float64, ()),
+    'seq': ('seq.u8', np.uint64, ()),
+    'landmarks': ('landmarks.f4', np.float32, (3,)),
+    'visibility': ('visibility.f4', np.float32, ()),
+}
+
+
+def _column_shape(name, landmarks):
+    _, _, tail = _COLUMNS[name]
+    if name in ('landmarks', 'visibility'):
+        return (landmarks,) + tail
+    return tail
+
+
+class SessionRecorder(object):
+    """Appends pose results to a session directory from a writer thread.
+
+    append() only puts a reference on a bounded queue, so the pose loop
+    never waits for disk; when the writer falls behind, the oldest pending
+    records are dropped and counted.
+    """
+
+    def __init__(self, path, landmarks=33, canvas=None, queue_size=1024,
+                 chunk_records=16384, flush_interval=1.0):
+        self.path = path
+        self.landmarks = landmarks
+        self._chunk = chunk_records
+        self._flush_interval = flush_interval
+        self._pending = deque(maxlen=queue_size)
+        self._wakeup = threading.Event()
+        self._columns = {}
+        self._capacity = 0
+        self.count = 0
+        self.dropped = 0
+        self._running = False
+        self._thread = None
+
+        os.makedirs(path, exist_ok=True)
+        self._meta = {
+            'version': 1,
+            'landmarks': landmarks,
+            # (width, height) the pixel coordinates refer to
+            'canvas': list(canvas) if canvas else None,
+            'count': 0,
+            # Maps the monotonic time column onto wall-clock time
+            'wall_start': time.time(),
+            'monotonic_start': time.monotonic(),
+        }
+        self._grow()
+        self._write_meta()
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    def append(self, timestamp, seq, landmarks):
+        """Queue one (33, 4) x, y, z, visibility array; never blocks"""
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append((timestamp, seq, landmarks))
+        self._wakeup.set()
+
+    def close(self):
+        """Write everything still queued and trim the files to the record count"""
+        self._running = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._drain()
+
+        for name, column in list(self._columns.items()):
+            column.flush()
+            del self._columns[name]
+        for name in _COLUMNS:
+            self._resize(name, self.count)
+        self._write_meta()
+
+    def _column_path(self, name):
+        return os.path.join(self.path, _COLUMNS[name][0])
+
+    def _resize(self, name, records):
+        _, dtype, _ = _COLUMNS[name]
+        record_size = np.dtype(dtype).itemsize * int(
+            np.prod(_column_shape(name, self.landmarks), dtype=np.int64))
+        with open(self._column_path(name), 'ab') as f:
+            f.truncate(records * record_size)
+
+    def _grow(self):
+        # Remap every column with room for another chunk of records
+        self._capacity += self._chunk
+        for name, (_, dtype, _) in _COLUMNS.items():
+            column = self._columns.pop(name, None)
+            if column is not None:
+                column.flush()
+                del column
+            self._resize(name, self._capacity)
+            self._columns[name] = np.memmap(
+                self._column_path(name), dtype=dtype, mode='r+',
+                shape=(self._capacity,) + _column_shape(name, self.landmarks))
+
+    def _write_meta(self):
+        self._meta['count'] = self.count
+        self._meta['dropped'] = self.dropped
+        tmp_path = os.path.join(self.path, 'meta.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._meta, f)
+        os.replace(tmp_path, os.path.join(self.path, 'meta.json'))
+
+    def _drain(self):
+        while self._pending:
+            timestamp, seq, landmarks = self._pending.popleft()
+            if self.count == self._capacity:
+                self._grow()
+            i = self.count
+            self._columns['time'][i] = timestamp
+            self._columns['seq'][i] = seq
+            self._columns['landmarks'][i] = landmarks[:, :3]
+            self._columns['visibility'][i] = landmarks[:, 3]
+            self.count += 1
+
+    def _writer_loop(self):
+        next_flush = time.monotonic() + self._flush_interval
+        while self._running:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            self._drain()
+
+            if time.monotonic() >= next_flush:
+                for column in self._columns.values():
+                    column.flush()
+                self._write_meta()
+                next_flush = time.monotonic() + self._flush_interval
+
+
+class SessionReader(object):
+    """Read-only, memory-mapped view of a recorded session"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.landmarks = self.meta['landmarks']
+
+        columns = {}
+        for name, (filename, dtype, _) in _COLUMNS.items():
+            shape = _column_shape(name, self.landmarks)
+            record_size = np.dtype(dtype).itemsize * int(np.prod(shape, dtype=np.int64))
+            size = os.path.getsize(os.path.join(path, filename))
+            records = size // record_size
+            columns[name] = np.memmap(os.path.join(path, filename), dtype=dtype,
+                                      mode='r', shape=(records,) + shape) if records else \
+                np.empty((0,) + shape, dtype=dtype)
+
+        # meta.json lags behind the data by up to one flush interval after a
+        # crash; preallocated records that were never written have time 0
+        count = min(self.meta['count'], len(columns['time']))
+        tail = columns['time'][count:]
+        if len(tail):
+            unwritten = np.flatnonzero(tail == 0)
+            count += int(unwritten[0]) if len(unwritten) else len(tail)
+
+        self.time = columns['time'][:count]
+        self.seq = columns['seq'][:count]
+        self.points = columns['landmarks'][:count]
+        self.visibility = columns['visibility'][:count]
+
+    def __len__(self):
+        return len(self.time)
+
+    @property
+    def start(self):
+        return float(self.time[0]) if len(self.time) else None
+
+    @property
+    def duration(self):
+        return float(self.time[-1] - self.time[0]) if len(self.time) else 0.0
+
+    def wall_time(self, timestamp):
+        """Convert a value of the time column to a Unix timestamp"""
+        return self.meta['wall_start'] + (timestamp - self.meta['monotonic_start'])
+
+    def index_range(self, start, end):
+        """Record indices [i, j) with start <= t - session start < end seconds"""
+        t0 = self.start or 0.0
+        i = int(np.searchsorted(self.time, t0 + start, side='left'))
+        j = int(np.searchsorted(self.time, t0 + end, side='left'))
+        return i, j
+
+    def slice(self, start, end):
+        """Records between start and end seconds into the session, as memmap views"""
+        i, j = self.index_range(start, end)
+        return {
+            'time': self.time[i:j],
+            'seq': self.seq[i:j],
+            'landmarks': self.points[i:j],
+            'visibility': self.visibility[i:j],
+        }
@@ -0,0 +1,53 @@
+"""
+Frame sinks for writing rendered frames instead of showing them
+
+VideoFileSink and ImageSequenceSink take BGR frames through write(frame)
+and are closed with release(), like cv.VideoWriter.
+"""
+import os
+
+import cv2 as cv
+
+
+class VideoFileSink(object):
+    """Writes frames to a video file; the codec follows the file extension"""
+
+    FOURCC = {'.avi': 'MJPG', '.mp4': 'mp4v', '.mkv': 'mp4v'}
+
+    def __init__(self, path, fps, size):
+        extension = os.path.splitext(path)[1].lower()
+        fourcc = cv.VideoWriter_fourcc(*self.FOURCC.get(extension, 'mp4v'))
+        self._writer = cv.VideoWriter(path, fourcc, fps, size)
+        if not self._writer.isOpened():
+            raise RuntimeError(f"Could not open video writer: {path}")
+        self.frames = 0
+
+    def write(self, frame):
+        self._writer.write(frame)
+        self.frames += 1
+
+    def release(self):
+        self._writer.release()
+
+
+class ImageSequenceSink(object):
+    """Writes numbered image files into a directory"""
+
+    def __init__(self, directory, extension='.png'):
+        os.makedirs(directory, exist_ok=True)
+        self._pattern = os.path.join(directory, '{:06d}' + extension)
+        self.frames = 0
+
+    def write(self, frame):
+        cv.imwrite(self._pattern.format(self.frames), frame)
+        self.frames += 1
+
+    def release(self):
+        pass
+
+
+def open_frame_sink(path, fps, size):
+    """Video file sink for paths with an extension, image sequence otherwise"""
+    if os.path.splitext(path)[1]:
+        return VideoFileSink(path, fps, size)
+    return ImageSequenceSink(path)
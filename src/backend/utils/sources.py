@@ -0,0 +1,253 @@
+"""
+Frame and landmark sources for running the pose server without a webcam
+
+VideoFileSource, ImageSequenceSource and SyntheticCamera mimic the parts of
+cv.VideoCapture that the server uses (read, set, get, isOpened, release).
+read() takes an optional output array like cv.VideoCapture.read(image).
+SyntheticPose stands in for mp.solutions.pose.Pose and returns scripted
+landmarks, so the broadcast path can be exercised without MediaPipe.
+"""
+import glob
+import math
+import os
+import random
+import time
+import types
+
+import cv2 as cv
+import numpy as np
+
+
+class _Pacer(object):
+    """Sleeps so that successive tick() calls are 1/fps apart"""
+
+    def __init__(self, fps):
+        self._period = 1.0 / fps if fps > 0 else 0.0
+        self._next = None
+
+    def tick(self):
+        if not self._period:
+            return
+        now = time.monotonic()
+        if self._next is None or now - self._next > 1.0:
+            # First frame, or we fell far behind: restart the schedule
+            self._next = now
+        elif self._next > now:
+            time.sleep(self._next - now)
+        self._next += self._period
+
+
+class VideoFileSource(object):
+    """Replays a video file, looping at the end"""
+
+    def __init__(self, path, realtime=True):
+        self._path = path
+        self._cap = cv.VideoCapture(path)
+        fps = self._cap.get(cv.CAP_PROP_FPS) or 30.0
+        self._pacer = _Pacer(fps if realtime else 0)
+
+    def read(self, image=None):
+        self._pacer.tick()
+        ret, frame = self._cap.read(image)
+        if not ret:
+            self._cap.set(cv.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self._cap.read(image)
+        return ret, frame
+
+    def set(self, prop, value):
+        # Frame size and buffering are properties of the file, not ours to change
+        return False
+
+    def get(self, prop):
+        return self._cap.get(prop)
+
+    def isOpened(self):
+        return self._cap.isOpened()
+
+    def release(self):
+        self._cap.release()
+
+
+class ImageSequenceSource(object):
+    """Replays a sorted set of image files at a fixed frame rate, looping"""
+
+    def __init__(self, pattern, fps=30.0, realtime=True):
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '*')
+        self._paths = sorted(path for path in glob.glob(pattern)
+                             if os.path.isfile(path))
+        self._index = 0
+        self._fps = fps
+        self._pacer = _Pacer(fps if realtime else 0)
+
+    def read(self, image=None):
+        if not self._paths:
+            return False, None
+        self._pacer.tick()
+        frame = cv.imread(self._paths[self._index])
+        self._index = (self._index + 1) % len(self._paths)
+        return frame is not None, frame
+
+    def set(self, prop, value):
+        return False
+
+    def get(self, prop):
+        if prop == cv.CAP_PROP_FPS:
+            return self._fps
+        if prop == cv.CAP_PROP_FRAME_COUNT:
+            return len(self._paths)
+        return 0.0
+
+    def isOpened(self):
+        return bool(self._paths)
+
+    def release(self):
+        self._paths = []
+
+
+class SyntheticCamera(object):
+    """Produces blank frames at a fixed rate, to drive SyntheticPose"""
+
+    def __init__(self, width=640, height=480, fps=30.0, realtime=True):
+        self._frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self._fps = fps
+        self._pacer = _Pacer(fps if realtime else 0)
+
+    def read(self, image=None):
+        # The frame never changes, so every caller shares the same array
+        self._pacer.tick()
+        return True, self._frame
+
+    def set(self, prop, value):
+        return False
+
+    def get(self, prop):
+        if prop == cv.CAP_PROP_FPS:
+            return self._fps
+        if prop == cv.CAP_PROP_FRAME_WIDTH:
+            return self._frame.shape[1]
+        if prop == cv.CAP_PROP_FRAME_HEIGHT:
+            return self._frame.shape[0]
+        return 0.0
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class _Landmark(object):
+    __slots__ = ('x', 'y', 'z', 'visibility')
+
+    def __init__(self, x, y, z=0.0, visibility=0.99):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+
+# Normalized image coordinates of a person standing in the middle of the frame
+_SKELETON = np.array([
+    (0.50, 0.20), (0.49, 0.18), (0.48, 0.18), (0.47, 0.18), (0.51, 0.18),
+    (0.52, 0.18), (0.53, 0.18), (0.46, 0.19), (0.54, 0.19), (0.49, 0.23),
+    (0.51, 0.23), (0.42, 0.32), (0.58, 0.32), (0.38, 0.45), (0.62, 0.45),
+    (0.36, 0.58), (0.64, 0.58), (0.35, 0.61), (0.65, 0.61), (0.35, 0.61),
+    (0.65, 0.61), (0.36, 0.60), (0.64, 0.60), (0.45, 0.60), (0.55, 0.60),
+    (0.45, 0.78), (0.55, 0.78), (0.45, 0.95), (0.55, 0.95), (0.45, 0.97),
+    (0.55, 0.97), (0.44, 0.99), (0.56, 0.99),
+])
+_LEFT_ARM = (13, 15, 17, 19, 21)
+_RIGHT_ARM = (14, 16, 18, 20, 22)
+
+
+def _circles(t, rng):
+    angle = 2 * math.pi * t / 2.0
+    return ((0.65 + 0.12 * math.cos(angle), 0.45 + 0.15 * math.sin(angle)),
+            (0.35 - 0.12 * math.cos(angle), 0.45 + 0.15 * math.sin(angle)))
+
+
+def _swipe(t, rng):
+    # Triangle wave across most of the frame, hands in opposite directions
+    phase = (t / 1.5) % 2.0
+    sweep = phase if phase < 1.0 else 2.0 - phase
+    return ((0.1 + 0.8 * sweep, 0.35), (0.9 - 0.8 * sweep, 0.55))
+
+
+def _still(t, rng):
+    return ((0.64, 0.58), (0.36, 0.58))
+
+
+class _RandomWalk(object):
+    """Smooth, seeded random hand motion"""
+
+    def __init__(self):
+        self._state = None
+
+    def __call__(self, t, rng):
+        if self._state is None:
+            self._state = [0.64, 0.5, 0.0, 0.0, 0.36, 0.5, 0.0, 0.0]
+        s = self._state
+        for i in (0, 4):
+            for axis in (0, 1):
+                s[i + 2 + axis] = 0.9 * s[i + 2 + axis] + rng.gauss(0, 0.004)
+                s[i + axis] = min(0.95, max(0.05, s[i + axis] + s[i + 2 + axis]))
+        return (s[0], s[1]), (s[4], s[5])
+
+
+SCRIPTS = {
+    'circles': _circles,
+    'swipe': _swipe,
+    'still': _still,
+    'random': _RandomWalk,
+}
+
+
+class SyntheticPose(object):
+    """Drop-in for mp.solutions.pose.Pose that returns scripted landmarks.
+
+    The left and right wrists follow the chosen script and the arms are
+    bent to meet them; the rest of the body stands still. Script time is
+    wall-clock time in realtime mode, otherwise frame count / fps, so
+    as-fast-as-possible runs are reproducible.
+    """
+
+    def __init__(self, script='circles', fps=30.0, realtime=True, seed=0):
+        if script not in SCRIPTS:
+            raise ValueError(f"Unknown synthetic script: {script} "
+                             f"(choose from {', '.join(SCRIPTS)})")
+        self._script = SCRIPTS[script]
+        if script == 'random':
+            self._script = self._script()
+        self._rng = random.Random(seed)
+        self._fps = fps
+        self._realtime = realtime
+        self._frames = 0
+        self._started = None
+
+    def process(self, image):
+        if self._realtime:
+            if self._started is None:
+                self._started = time.monotonic()
+            t = time.monotonic() - self._started
+        else:
+            t = self._frames / self._fps
+        self._frames += 1
+
+        points = _SKELETON.copy()
+        left, right = self._script(t, self._rng)
+        for arm, wrist, shoulder in ((_LEFT_ARM, left, 11), (_RIGHT_ARM, right, 12)):
+            wrist = np.array(wrist)
+            elbow = (points[shoulder] + wrist) / 2 + (0.0, 0.04)
+            points[arm[0]] = elbow
+            points[arm[1]] = wrist
+            points[list(arm[2:])] = wrist + (0.0, 0.02)
+
+        landmarks = [_Landmark(x, y) for x, y in points.tolist()]
+        world = [_Landmark((x - 0.5) * 1.6, (y - 0.6) * 1.8) for x, y in points.tolist()]
+        return types.SimpleNamespace(
+            pose_landmarks=types.SimpleNamespace(landmark=landmarks),
+            pose_world_landmarks=types.SimpleNamespace(landmark=world))
+
+    def close(self):
+        pass
@@ -0,0 +1,45 @@
+import time
+
+from .rollingstats import RollingStats
+
+
+class StageTimer(object):
+    """Named RollingStats probes, typically stage latencies in milliseconds"""
+
+    def __init__(self, window=600):
+        self._window = window
+        self._probes = {}
+        self._last_ticks = {}
+
+    def probe(self, name, window=None):
+        """The RollingStats behind a name, created on first use"""
+        probe = self._probes.get(name)
+        if probe is None:
+            # setdefault keeps a single probe if two threads race to create it
+            probe = self._probes.setdefault(name, RollingStats(window or self._window))
+        return probe
+
+    def record(self, stage, elapsed_ms):
+        # Each stage is recorded from a single thread, so no lock is needed
+        probe = self._probes.get(stage)
+        if probe is None:
+            probe = self.probe(stage)
+        probe.add(elapsed_ms)
+
+    def tick(self, name, now=None):
+        """Record the milliseconds since the previous tick of name"""
+        if now is None:
+            now = time.monotonic()
+        last = self._last_ticks.get(name)
+        self._last_ticks[name] = now
+        if last is not None:
+            self.record(name, (now - last) * 1000.0)
+
+    def snapshot(self):
+        """Return {stage: {count, mean, p50, p95, p99, max}} over the window"""
+        stats = {}
+        for stage, probe in list(self._probes.items()):
+            summary = probe.snapshot()
+            if summary is not None:
+                stats[stage] = summary
+        return stats
@@ -0,0 +1,109 @@
+"""
+Compact binary encoding for handPositions messages
+
+Clients opt in by offering the SUBPROTOCOL_BINARY WebSocket subprotocol;
+everyone else keeps receiving JSON. Frame layout (little-endian):
+
+    uint8    version     WIRE_VERSION
+    uint8    count       number of points that follow
+    uint16   flags       bit 0 (FLAG_PREDICTED): extrapolated, not measured
+    uint32   seq         pose result sequence number
+    float64  timestamp   seconds since the epoch, taken at broadcast
+    float64  captured    server time.monotonic() of the camera frame
+                         (version 2 only; NaN when unknown)
+    uint64   visible     bit i is set when point i is visible
+    float32  x, y        canvas pixels, repeated count times
+
+The first points are the hands in HAND_ORDER. A client that subscribed to
+landmarks gets them appended, in the order the server confirmed. Clients
+that still offer SUBPROTOCOL_BINARY_V1 get version 1 frames.
+"""
+import struct
+
+import numpy as np
+
+SUBPROTOCOL_JSON = 'pose.json.v1'
+SUBPROTOCOL_BINARY = 'pose.bin.v2'
+SUBPROTOCOL_BINARY_V1 = 'pose.bin.v1'
+
+WIRE_VERSION = 2
+# Wire format version spoken on each binary subprotocol
+WIRE_VERSIONS = {SUBPROTOCOL_BINARY: 2, SUBPROTOCOL_BINARY_V1: 1}
+
+FLAG_PREDICTED = 0x0001
+
+# Point order of a handPositions frame
+HAND_ORDER = ('leftHand', 'rightHand')
+
+_HEADERS = {1: struct.Struct('<BBHIdQ'), 2: struct.Struct('<BBHIddQ')}
+_POINTS = {}
+
+
+def _points_struct(count):
+    points = _POINTS.get(count)
+    if points is None:
+        points = _POINTS[count] = struct.Struct(f'<{2 * count}f')
+    return points
+
+
+def encode_hand_positions(seq, timestamp, positions, predicted=False,
+                          landmarks=None, order=HAND_ORDER, captured_at=None,
+                          version=WIRE_VERSION):
+    """Pack a handPositions snapshot into a binary frame.
+
+    landmarks is an optional (n, 4) array of x, y, z, visibility rows to
+    append after the hands.
+    """
+    visible = 0
+    coords = []
+    for i, name in enumerate(order):
+        pos = positions[name]
+        if pos['visible']:
+            visible |= 1 << i
+        coords.append(pos['x'])
+        coords.append(pos['y'])
+    body = _points_struct(len(order)).pack(*coords)
+
+    count = len(order)
+    if landmarks is not None and len(landmarks):
+        bits = np.flatnonzero(landmarks[:, 3] > 0.5) + count
+        for bit in bits.tolist():
+            visible |= 1 << bit
+        body += np.ascontiguousarray(landmarks[:, :2], dtype='<f4').tobytes()
+        count += len(landmarks)
+
+    flags = FLAG_PREDICTED if predicted else 0
+    if version == 1:
+        header = _HEADERS[1].pack(1, count, flags, seq & 0xFFFFFFFF,
+                                  timestamp, visible)
+    else:
+        captured = float('nan') if captured_at is None else captured_at
+        header = _HEADERS[2].pack(2, count, flags, seq & 0xFFFFFFFF,
+                                  timestamp, captured, visible)
+    return header + body
+
+
+def decode_hand_positions(frame, order=HAND_ORDER):
+    """Unpack a binary frame into (seq, timestamp, positions, predicted,
+    captured_at); captured_at is None for version 1 frames"""
+    version = frame[0]
+    header = _HEADERS.get(version)
+    if header is None:
+        raise ValueError(f"Unsupported wire format version: {version}")
+    if version == 1:
+        _, count, flags, seq, timestamp, visible = header.unpack_from(frame)
+        captured_at = None
+    else:
+        _, count, flags, seq, timestamp, captured_at, visible = header.unpack_from(frame)
+        if captured_at != captured_at:
+            captured_at = None
+
+    coords = _points_struct(count).unpack_from(frame, header.size)
+    positions = {}
+    for i, name in enumerate(order[:count]):
+        positions[name] = {
+            'x': coords[2 * i],
+            'y': coords[2 * i + 1],
+            'visible': bool(visible >> i & 1)
+        }
+    return seq, timestamp, positions, bool(flags & FLAG_PREDICTED), captured_at